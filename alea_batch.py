@@ -0,0 +1,108 @@
+"""Vectorized Alea PRNG streams for lock-step population stepping.
+
+Requires NumPy (optional dependency, only needed for population tooling).
+AleaBatch keeps N independent (s0, s1, s2, c) states in NumPy arrays and
+advances all of them with one array operation. Stream i produces bit-for-bit
+the same sequence as a game.AleaRandom with the same state, because the
+recurrence uses the same float64 operations in the same order.
+"""
+import numpy as np
+
+import game
+
+_TWO_POW_MINUS_32 = 2.3283064365386963e-10
+
+def _object_array(a):
+    """1-D object array of the items of `a` (tuples stay tuples, unlike np.asarray)."""
+    arr = np.empty(len(a), dtype=object)
+    for i, item in enumerate(a):
+        arr[i] = item
+    return arr
+
+
+class AleaBatch:
+    """N Alea streams advanced together."""
+    __slots__ = ("s0", "s1", "s2", "c")
+
+    def __init__(self, states):
+        arr = np.array(states, dtype=np.float64).reshape(-1, 4)
+        self.s0 = arr[:, 0].copy()
+        self.s1 = arr[:, 1].copy()
+        self.s2 = arr[:, 2].copy()
+        self.c = arr[:, 3].copy()
+
+    @classmethod
+    def from_seeds(cls, seeds):
+        """One stream per seed; a seed is a value or a list of seed_random args."""
+        rng = game.AleaRandom()
+        states = []
+        for seed in seeds:
+            states.append(rng.seed(seed if isinstance(seed, (list, tuple)) else [seed]))
+        return cls(states)
+
+    @classmethod
+    def from_game_states(cls, game_states):
+        """Batch continuing the per-character streams of the given game states."""
+        return cls([game.get_rng(gs).get_state() for gs in game_states])
+
+    def __len__(self):
+        return len(self.s0)
+
+    def get_state(self, i):
+        """Return stream i as a [s0, s1, s2, c] list (the .pqw `seed` format)."""
+        return [float(self.s0[i]), float(self.s1[i]), float(self.s2[i]), int(self.c[i])]
+
+    def get_states(self):
+        """Return all stream states, e.g. to hand them back to AleaRandom objects."""
+        return [self.get_state(i) for i in range(len(self))]
+
+    def random(self, where=None):
+        """Advance every stream (or only those where `where` is True) and return floats [0, 1).
+
+        Streams that are masked out keep their state and report 0.0.
+        """
+        t = 2091639.0 * self.s0 + self.c * _TWO_POW_MINUS_32
+        c = np.floor(t)
+        s2 = t - c
+        if where is None:
+            self.s0 = self.s1
+            self.s1 = self.s2
+            self.s2 = s2
+            self.c = c
+            return s2
+        self.s0 = np.where(where, self.s1, self.s0)
+        self.s1 = np.where(where, self.s2, self.s1)
+        self.s2 = np.where(where, s2, self.s2)
+        self.c = np.where(where, c, self.c)
+        return np.where(where, s2, 0.0)
+
+    def random_int(self, n):
+        """Batched Random(n): integers 0 <= x < n, n scalar or one per stream.
+
+        Like the scalar version, streams with n <= 0 get 0 and do not advance.
+        """
+        n = np.asarray(n)
+        active = n > 0
+        if active.all():
+            return np.floor(self.random() * n).astype(np.int64)
+        active = np.broadcast_to(active, self.s0.shape)
+        return np.floor(self.random(active) * np.maximum(n, 0)).astype(np.int64)
+
+    def pick(self, a):
+        """Batched Pick: one element of `a` per stream."""
+        if not a: return np.full(len(self), None, dtype=object)
+        return _object_array(a)[self.random_int(len(a))]
+
+    def random_low(self, below):
+        """Batched RandomLow: the lower of two draws per stream."""
+        first = self.random_int(below)
+        return np.minimum(first, self.random_int(below))
+
+    def pick_low(self, s):
+        """Batched PickLow: one element of `s` per stream, favoring low indices."""
+        if not s: return np.full(len(self), None, dtype=object)
+        return _object_array(s)[self.random_low(len(s))]
+
+    def rand_sign(self):
+        """Batched RandSign: 1 or -1 per stream."""
+        return self.random_int(2) * 2 - 1
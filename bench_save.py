@@ -0,0 +1,81 @@
+"""Benchmark the .pqb binary save format against the base64 JSON .pqw format.
+
+Simulates a few seeded characters for a long stretch of game time, has each
+win --items more items (a simulated character sells its loot, so its pack
+stays small) and reports, for each format, the file size and the time to
+encode the save dict and to decode the file contents back into a dict.
+Larger --log-capacity values (0 = unbounded) make for bigger saves, e.g.:
+
+    python bench_save.py --hours 500 --log-capacity 20000
+"""
+import argparse
+import sys
+import timeit
+
+import game
+
+
+def simulate_character(seed, hours, items):
+    """A seeded character after `hours` of game time and `items` won items, as a .pqw dict."""
+    rng = game.AleaRandom()
+    rng.seed([seed])
+    stats = game.roll_stats(rng)
+    game_state = game.create_new_character(game.generate_name(rng), "Half Orc", "Ur-Paladin", stats, rng)
+    game.simulate(game_state, round(hours * 3600))
+    for _ in range(items):
+        game.win_item(game_state, rng)
+    game.prepare_save(game_state)
+    return game.to_pqw_dict(game_state)
+
+
+def best_ms(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def measure(data, extension, repeat):
+    filename = f"bench{extension}"
+    contents = game.encode_save(data, filename)
+    if game.decode_save(contents) is None:
+        raise SystemExit(f"{extension} round trip failed")
+    return {
+        "bytes": len(contents),
+        "encode_ms": best_ms(lambda: game.encode_save(data, filename), repeat),
+        "decode_ms": best_ms(lambda: game.decode_save(contents), repeat),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare .pqb and .pqw save size and speed.")
+    parser.add_argument("--characters", type=int, default=3, help="characters to simulate (default 3)")
+    parser.add_argument("--seed", type=int, default=1, help="base seed (default 1)")
+    parser.add_argument("--hours", type=float, default=200.0, help="game time per character (default 200)")
+    parser.add_argument("--items", type=int, default=1000, help="items won after simulating (default 1000)")
+    parser.add_argument("--log-capacity", type=int, default=game.LOG_CAPACITY,
+                        help=f"event log entries kept, 0 = all (default {game.LOG_CAPACITY})")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, best is kept (default 5)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    game.LOG_CAPACITY = args.log_capacity
+    totals = {ext: {"bytes": 0, "encode_ms": 0.0, "decode_ms": 0.0} for ext in game.SAVE_EXTENSIONS}
+    for i in range(args.characters):
+        data = simulate_character(args.seed + i, args.hours, args.items)
+        print(f"Character {i + 1}: Level {data['Traits']['Level']}, {len(data['Inventory'])} inventory rows, "
+              f"{len(data['Spells'])} spells, {len(data['log'])} log entries")
+        for ext in game.SAVE_EXTENSIONS:
+            result = measure(data, ext, args.repeat)
+            print(f"  {ext}: {result['bytes']:>9} bytes, encode {result['encode_ms']:7.2f} ms, "
+                  f"decode {result['decode_ms']:7.2f} ms")
+            for key, value in result.items():
+                totals[ext][key] += value
+    pqw, pqb = totals[".pqw"], totals[".pqb"]
+    print(f".pqb vs .pqw: {pqb['bytes'] / pqw['bytes']:.2f}x size, "
+          f"{pqb['encode_ms'] / pqw['encode_ms']:.2f}x encode time, "
+          f"{pqb['decode_ms'] / pqw['decode_ms']:.2f}x decode time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
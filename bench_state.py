@@ -0,0 +1,144 @@
+"""Benchmark the GameState model against the old dict-based game state.
+
+Runs the same seeded character through a long game.simulate run and reports
+CPU time per completed task. Memory per character state (measured with
+tracemalloc over copies) and the cost of the hot accessors are measured on a
+large character built directly: --levels level-ups (each with a spell and a
+piece of equipment) and --items won items, drawn from the same PRNG stream
+in every version, so both sides measure the same state. Pass --baseline with
+the path of a game.py from before GameState (the last version that kept the
+game state in nested dicts, e.g. saved with `git show <commit>:game.py`) to
+compare against it:
+
+    python bench_state.py --hours 200 --baseline /tmp/game_dict.py
+"""
+import argparse
+import copy
+import importlib.util
+import sys
+import time
+import timeit
+import tracemalloc
+
+import game
+
+
+def load_module(path, name="game_dict"):
+    """Import a game.py from an arbitrary path under another module name."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(mod, seed, hours):
+    """Create a character with `mod` and simulate it; returns (state, cpu_seconds, tasks)."""
+    rng = mod.AleaRandom()
+    rng.seed([seed])
+    stats = mod.roll_stats(rng)
+    game_state = mod.create_new_character("Bench", "Half Orc", "Ur-Paladin", stats, rng)
+    started = time.process_time()
+    tasks = mod.simulate(game_state, round(hours * 3600))
+    return game_state, time.process_time() - started, tasks
+
+
+def build_large(mod, seed, levels, items):
+    """A character grown directly by `levels` level-ups and `items` won items."""
+    rng = mod.AleaRandom()
+    rng.seed([seed])
+    stats = mod.roll_stats(rng)
+    game_state = mod.create_new_character("Bench", "Half Orc", "Ur-Paladin", stats, rng)
+    for _ in range(levels):
+        mod.level_up(game_state, rng)
+        mod.win_equip(game_state, rng)
+    for _ in range(items):
+        mod.win_item(game_state, rng)
+    if hasattr(mod, "clear_changes"): # As after the next journal record of a running game
+        mod.clear_changes(game_state)
+    return game_state
+
+
+def state_bytes(game_state, copies=20):
+    """Average bytes allocated by one deep copy of the state."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [copy.deepcopy(game_state) for _ in range(copies)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used / copies
+
+
+def without_log(game_state):
+    """Shallow copy of the state with an empty log (the log is the same size either way)."""
+    trimmed = copy.copy(game_state)
+    trimmed["log"] = {}
+    return trimmed
+
+
+def accessor_ns(mod, game_state, number=200000):
+    """Nanoseconds per call of the accessors the engine calls several times per task."""
+    calls = {
+        "get_trait_i(Level)": lambda: mod.get_trait_i(game_state, 'Level'),
+        "get_stat(STR)": lambda: mod.get_stat(game_state, 'STR'),
+        "get_equip(Weapon)": lambda: mod.get_equip(game_state, 'Weapon'),
+    }
+    return {label: min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e9
+            for label, fn in calls.items()}
+
+
+def measure(label, mod, args):
+    game_state, cpu, tasks = run(mod, args.seed, args.hours)
+    started = time.process_time()
+    large = build_large(mod, args.seed, args.levels, args.items)
+    build_cpu = time.process_time() - started
+    result = {
+        "label": label,
+        "tasks": tasks,
+        "level": mod.get_trait_i(game_state, 'Level'),
+        "us_per_task": cpu / max(1, tasks) * 1e6,
+        "us_per_step": build_cpu / max(1, 2 * args.levels + args.items) * 1e6,
+        "large": (mod.get_trait_i(large, 'Level'), len(large["Inventory"]), len(large["Spells"])),
+        "state_kib": state_bytes(large) / 1024,
+        "bare_kib": state_bytes(without_log(large)) / 1024,
+        "accessors": accessor_ns(mod, large),
+    }
+    print(f"{label:>9}: {tasks} tasks (reached Level {result['level']}), {result['us_per_task']:.2f} us/task; "
+          "large character (Level {}, {} inventory rows, {} spells): ".format(*result["large"])
+          + f"{result['us_per_step']:.2f} us/step to build, "
+          f"{result['state_kib']:.1f} KiB/state ({result['bare_kib']:.1f} KiB without the log)")
+    for name, ns in result["accessors"].items():
+        print(f"{'':>11}{name:<20} {ns:6.1f} ns")
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare GameState with the dict-based game state.")
+    parser.add_argument("--hours", type=float, default=100.0, help="game time to simulate (default 100)")
+    parser.add_argument("--seed", type=int, default=1, help="character seed (default 1)")
+    parser.add_argument("--levels", type=int, default=80, help="level-ups of the large character (default 80)")
+    parser.add_argument("--items", type=int, default=2000, help="items won by the large character (default 2000)")
+    parser.add_argument("--baseline", help="path to a game.py that still uses dict game states")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = measure("GameState", game, args)
+    if not args.baseline:
+        return 0
+    baseline = measure("dict", load_module(args.baseline), args)
+    if baseline["tasks"] != current["tasks"]:
+        print("Warning: the simulations diverged (a game rule changed in between); "
+              "the per-task numbers are not directly comparable")
+    if baseline["large"] != current["large"]:
+        print("Warning: the large characters differ; the memory numbers are not directly comparable")
+    print(f"GameState vs dict: {current['us_per_task'] / baseline['us_per_task']:.2f}x CPU per task, "
+          f"{current['us_per_step'] / baseline['us_per_step']:.2f}x CPU per build step, "
+          f"{current['state_kib'] / baseline['state_kib']:.2f}x memory per state, "
+          f"{current['bare_kib'] / baseline['bare_kib']:.2f}x without the log")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
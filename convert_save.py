@@ -0,0 +1,48 @@
+"""Convert Progress Quest saves between the .pqw and .pqb formats.
+
+.pqw is the web version's base64 JSON; .pqb is the compact binary format
+(see game.bin_encode). The input format is detected from the file contents
+and the output format follows each output file's extension. With a single
+argument the file is converted next to itself with the other extension.
+
+Example:
+    python convert_save.py savegame/Hero.pqw                # -> savegame/Hero.pqb
+    python convert_save.py savegame/Hero.pqb export/Hero.pqw
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import game
+
+
+def default_output(src):
+    """The same path with the other save extension."""
+    return src.with_suffix(".pqw" if src.suffix.lower() == ".pqb" else ".pqb")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert saves between .pqw and .pqb.")
+    parser.add_argument("source", type=Path, help="save file to read (.pqw or .pqb)")
+    parser.add_argument("output", type=Path, nargs="?", help="file to write (default: source with the other extension)")
+    parser.add_argument("--force", action="store_true", help="overwrite an existing output file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or default_output(args.source)
+    if output.suffix.lower() not in game.SAVE_EXTENSIONS:
+        print(f"Output must end in one of {', '.join(game.SAVE_EXTENSIONS)}: {output}")
+        return 2
+    if output.exists() and not args.force:
+        print(f"{output} already exists (use --force to overwrite)")
+        return 1
+    if not game.convert_save(args.source, output):
+        return 1
+    print(f"{args.source} ({args.source.stat().st_size} bytes) -> {output} ({output.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,17 @@ import base64
 import os
 from pathlib import Path
 import copy
+import bisect
+import re
+import struct
+import zlib
+import threading
+import sqlite3
+import hashlib
+import shutil
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
 
 # --- Constants (Ported from config.js K object) ---
 
@@ -284,11 +295,13 @@ DEFAULT_SAVE_SCHEMA = {
   "saveName": "", # Character name, potentially with realm (unused here)
   "bestspell": "", # Best spell string (e.g., "Slime Finger I")
   "bestquest": "", # Current quest description string
-  "log": {} # Optional logging {timestamp: message}
+  "log": {}, # Optional logging {timestamp: message}
+  "logStore": None, # {"size": bytes, "count": entries} of the log store, when the log is kept there
+  "schemaVersion": 1 # SAVE_SCHEMA_VERSION; saves without it are version 0
 }
+SAVE_SCHEMA_VERSION = DEFAULT_SAVE_SCHEMA["schemaVersion"]
 
 # --- PRNG (Simplified Alea-like state management) ---
-_alea_state = [0.0, 0.0, 0.0, 0.0] # s0, s1, s2, c
 
 def _mash(data):
     n = 0xefc8249d
@@ -304,78 +317,138 @@ def _mash(data):
         n += h * 0x100000000 # Simulate 2^32
     return (int(n) & 0xFFFFFFFF) * 2.3283064365386963e-10 # Simulate (n >>> 0) * 2^-32
 
-def seed_random(seed_args=None):
-    """Initialize or set the PRNG state."""
-    global _alea_state
-    s0, s1, s2 = 0.0, 0.0, 0.0
-    c = 1.0
+_floor = math.floor
 
-    if seed_args is None:
-        seed_args = [time.time()]
+class AleaRandom:
+    """One Alea PRNG stream (s0, s1, s2, c).
 
-    mash = _mash
-    s0 = mash(' ')
-    s1 = mash(' ')
-    s2 = mash(' ')
+    Each character carries its own stream (see get_rng) so several characters
+    can be simulated side by side without disturbing each other's sequences.
+    """
+    __slots__ = ("s0", "s1", "s2", "c")
 
-    for arg in seed_args:
-        s0 -= mash(arg)
-        s0 += 1.0 if s0 < 0 else 0.0
-        s1 -= mash(arg)
-        s1 += 1.0 if s1 < 0 else 0.0
-        s2 -= mash(arg)
-        s2 += 1.0 if s2 < 0 else 0.0
+    def __init__(self, state=None):
+        self.s0, self.s1, self.s2, self.c = 0.0, 0.0, 0.0, 1.0
+        if state and len(state) == 4 and any(state):
+            self.set_state(state)
+        else:
+            self.seed()
+
+    def seed(self, seed_args=None):
+        """Initialize the stream from a list of seed values (default: current time)."""
+        if seed_args is None:
+            seed_args = [time.time()]
+
+        mash = _mash
+        s0 = mash(' ')
+        s1 = mash(' ')
+        s2 = mash(' ')
+
+        for arg in seed_args:
+            s0 -= mash(arg)
+            s0 += 1.0 if s0 < 0 else 0.0
+            s1 -= mash(arg)
+            s1 += 1.0 if s1 < 0 else 0.0
+            s2 -= mash(arg)
+            s2 += 1.0 if s2 < 0 else 0.0
+
+        self.s0, self.s1, self.s2, self.c = s0, s1, s2, 1.0
+        return self.get_state()
+
+    def get_state(self):
+        """Return the stream state as a [s0, s1, s2, c] list (the .pqw `seed` format)."""
+        return [self.s0, self.s1, self.s2, self.c]
+
+    def set_state(self, state):
+        """Restore a [s0, s1, s2, c] state."""
+        if state and len(state) == 4:
+            self.s0, self.s1, self.s2, self.c = state
+
+    def random(self):
+        """Generate a random float [0, 1)."""
+        t = 2091639.0 * self.s0 + self.c * 2.3283064365386963e-10 # 2^-32
+        self.s0 = self.s1
+        self.s1 = self.s2
+        self.c = c = _floor(t)
+        self.s2 = s2 = t - c
+        return s2
+
+    def random_int(self, n):
+        """Return a random integer 0 <= x < n (JS Random)."""
+        if n <= 0: return 0
+        # Recurrence inlined: this is the hottest call in the game
+        t = 2091639.0 * self.s0 + self.c * 2.3283064365386963e-10
+        self.s0 = self.s1
+        self.s1 = self.s2
+        self.c = c = _floor(t)
+        self.s2 = s2 = t - c
+        return _floor(s2 * n)
+
+    def pick(self, a):
+        """Pick a random element from list a."""
+        if not a: return None
+        return a[self.random_int(len(a))]
+
+    def random_low(self, below):
+        """Return the minimum of two random numbers below 'below'."""
+        return min(self.random_int(below), self.random_int(below))
+
+    def pick_low(self, s):
+        """Pick an element from list s using a random_low index."""
+        if not s: return None
+        return s[self.random_low(len(s))]
+
+    def rand_sign(self):
+        """Return 1 or -1 randomly."""
+        return self.random_int(2) * 2 - 1
+
+
+# Module-wide stream, used by the compatibility functions below and by
+# anything that has no game state yet (name generation, stat rolls).
+_alea = AleaRandom()
 
-    _alea_state = [s0, s1, s2, c]
-    return _alea_state # Return the new state
+def seed_random(seed_args=None):
+    """Initialize or set the PRNG state."""
+    return _alea.seed(seed_args)
 
 def get_random_state():
     """Get the current PRNG state."""
-    return _alea_state[:] # Return a copy
+    return _alea.get_state()
 
 def set_random_state(state):
     """Set the PRNG state."""
-    global _alea_state
-    if state and len(state) == 4:
-        _alea_state = state[:] # Use a copy
+    _alea.set_state(state)
 
 def random_alea():
     """Generate a random float [0, 1) using Alea state."""
-    global _alea_state
-    s0, s1, s2, c = _alea_state
-    t = 2091639.0 * s0 + c * 2.3283064365386963e-10 # 2^-32
-    s0 = s1
-    s1 = s2
-    s2 = t - math.floor(t)
-    c = math.floor(t)
-    _alea_state = [s0, s1, s2, c]
-    return s2
+    return _alea.random()
 
 def Random(n):
     """Return a random integer 0 <= x < n."""
-    if n <= 0: return 0
-    return math.floor(random_alea() * n)
+    return _alea.random_int(n)
 
 def Pick(a):
     """Pick a random element from list a."""
-    if not a: return None
-    return a[Random(len(a))]
+    return _alea.pick(a)
 
 def RandomLow(below):
     """Return the minimum of two random numbers below 'below'."""
-    return min(Random(below), Random(below))
+    return _alea.random_low(below)
 
 def PickLow(s):
     """Pick an element from list s using RandomLow index."""
-    if not s: return None
-    return s[RandomLow(len(s))]
+    return _alea.pick_low(s)
 
 def RandSign():
   """Return 1 or -1 randomly."""
-  return Random(2) * 2 - 1
+  return _alea.rand_sign()
 
-# Initialize PRNG on module load
-seed_random()
+def get_rng(game_state):
+    """Return the character's own PRNG stream, creating it from the saved seed if needed."""
+    rng = game_state.rng
+    if rng is None:
+        rng = game_state.rng = AleaRandom(game_state.seed)
+    return rng
 
 # --- Helper Functions ---
 
@@ -425,11 +498,12 @@ def definite(s, qty):
         s = plural(s)
     return 'the ' + s
 
-def generate_name():
+def generate_name(rng=None):
     """Generate a random fantasy name."""
+    rng = rng or _alea
     result = ''
     for i in range(6): # 0 to 5
-        result += Pick(K_PARTS[i % 3])
+        result += rng.pick(K_PARTS[i % 3])
     return result.capitalize()
 
 def str_to_int_def(s, default=0):
@@ -541,60 +615,486 @@ def to_arabic(s):
     return result
 
 
+# --- Event Log ---
+
+LOG_CAPACITY = 1000 # Events kept in memory (and in the .pqw); 0 = unbounded
+LOG_SPILL = False # Append evicted events to SAVE_DIR/<Name>.log
+LOG_STORE = True # Keep the whole log in SAVE_DIR/<save filename>.pql instead of the save (files backend)
+LOG_STORE_BATCH = 1000 # New events buffered before they are appended between saves
+_LOG_FETCH_LOCK = threading.Lock() # One reader per lazily loaded log, see fetch_older()
+
+class EventLog(OrderedDict):
+    """Bounded {timestamp: message} log that evicts its oldest entries.
+
+    Serializes exactly like the plain `log` dict of the .pqw format. When a
+    spill path is set, evicted entries are appended to that text file
+    (one `timestamp<TAB>message` line each) instead of being dropped.
+    A capacity of 0 keeps everything, like the old unbounded log.
+    With a `store` (LogStore), every new entry is appended to it on flush()
+    and the log itself is only the in-memory tail; nothing is spilled.
+    A lazily loaded log starts with only the entries logged since loading;
+    fetch_older() reads the saved ones from `source` off the engine thread
+    and load_older() merges them.
+    """
+
+    def __init__(self, entries=None, capacity=LOG_CAPACITY, spill_path=None):
+        super().__init__()
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.source = None # .pqw file or LogStore whose older entries haven't been loaded yet
+        self.store = None # LogStore holding every entry, see attach_log_store()
+        self.migrate_path = None # Log store the embedded log of `source` moves to once read
+        self._fetched = None # (entries, store) read by fetch_older(), not merged yet
+        self._pending = [] # Evicted lines not yet written to spill_path
+        self._unstored = [] # [stamp, message] entries not yet appended to store
+        self._new = 0 # Entries added since the last take_new(): the newest ones in the log
+        for stamp, message in (entries or {}).items():
+            try:
+                stamp = float(stamp) # JSON turns keys into strings
+            except ValueError:
+                stamp = None
+            self.add(message, stamp)
+        self._new = 0 # Loaded entries are already saved
+
+    def add(self, message, stamp=None):
+        """Append an event, evicting the oldest one when full."""
+        if stamp is None: stamp = time.time()
+        while stamp in self: # Same-timestamp events must not overwrite each other
+            stamp += 1e-6
+        while len(self) >= self.capacity > 0:
+            old_stamp, old_message = self.popitem(last=False)
+            if self.spill_path and self.store is None:
+                self._pending.append(f"{old_stamp!r}\t{old_message}\n")
+        self[stamp] = message
+        if self.store is not None or self.migrate_path is not None: # Goes to the store after the saved log
+            self._unstored.append([stamp, message])
+        if self.store is not None: # The store is the journal of the log
+            if len(self._unstored) >= LOG_STORE_BATCH: self.flush()
+            return
+        self._new += 1
+        if len(self._pending) >= self.capacity:
+            self.flush()
+
+    def merge_older(self, entries, store=None):
+        """Put the saved entries in front of the ones logged since loading.
+
+        Only applies while `source` is still set, so a late merge is harmless.
+        `store` is the log store an embedded log was moved to, if any.
+        """
+        if self.source is None: return
+        self.source = None
+        newer = list(self.items())
+        self.clear()
+        for stamp, message in entries.items():
+            try:
+                stamp = float(stamp)
+            except ValueError:
+                continue
+            self[stamp] = message
+        for stamp, message in newer:
+            self.pop(stamp, None)
+            self[stamp] = message
+        while len(self) > self.capacity > 0:
+            old_stamp, old_message = self.popitem(last=False)
+            if self.spill_path and self.store is None:
+                self._pending.append(f"{old_stamp!r}\t{old_message}\n")
+        if self.migrate_path is not None:
+            self.migrate_path = None
+            if store is None: # Could not be written: the log stays embedded
+                self._unstored.clear()
+            else: # Entries logged since loading follow the saved ones into the store
+                self.store = store
+                self._new = 0
+
+    def fetch_older(self):
+        """Read the entries still in `source` for load_older(); safe on a worker thread.
+
+        A log store source is read from its end, up to capacity entries. An
+        embedded log that moves to a log store is written out to it here.
+        """
+        with _LOG_FETCH_LOCK:
+            source = self.source
+            if source is None or self._fetched is not None: return
+            if isinstance(source, LogStore):
+                self._fetched = dict(source.tail(self.capacity or None)), None
+                return
+            entries = read_pqw_log(source)
+            store = None
+            if self.migrate_path is not None:
+                store = LogStore(self.migrate_path)
+                store.truncate() # Leftovers from another save of this name
+                if not store.append(list(EventLog(entries, capacity=0).items())): store = None
+            self._fetched = entries, store
+
+    def load_older(self):
+        """Merge the entries still in `source`, if any (blocks until they are read)."""
+        if self.source is None: return
+        self.fetch_older()
+        entries, store = self._fetched
+        self._fetched = None
+        self.merge_older(entries, store)
+
+    def take_new(self):
+        """[[stamp, message], ...] added since the last call (for the save journal).
+
+        Read from the end of the log; entries evicted in the meantime are gone.
+        """
+        count, self._new = min(self._new, len(self)), 0
+        entries = [[stamp, message] for stamp, message in itertools.islice(reversed(self.items()), count)]
+        entries.reverse()
+        return entries
+
+    def replay(self, entries):
+        """Re-add journaled entries; evictions are not spilled a second time."""
+        spill_path, self.spill_path = self.spill_path, None
+        try:
+            for stamp, message in entries:
+                self.add(message, stamp)
+        finally:
+            self.spill_path = spill_path
+        self._new = 0
+
+    def flush(self):
+        """Append new entries to the store, or pending evicted ones to the spill file."""
+        if self.store is not None:
+            if self._unstored and self.store.append(self._unstored):
+                self._unstored.clear()
+            return
+        if not self._pending or not self.spill_path: return
+        try:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.writelines(self._pending)
+            self._pending.clear()
+        except OSError as e:
+            print(f"Error writing event log {self.spill_path}: {e}")
+
+def make_event_log(game_state, entries=None):
+    """Create the character's EventLog using the module-wide capacity/spill settings."""
+    spill_path = None
+    if LOG_SPILL:
+        spill_path = SAVE_DIR / f"{game_state.Traits.get('Name', 'UnnamedCharacter')}.log"
+    return EventLog(entries, LOG_CAPACITY, spill_path)
+
+
+# --- Inventory ---
+
+EDIT_HISTORY = 16 # Row edits Inventory and Spellbook keep at least, for edits_since()
+
+def _record_edit(collection, edit):
+    """Shared Inventory/Spellbook edit bookkeeping: a sequence number and a short window."""
+    collection.version += 1
+    edits = collection._edits
+    edits.append(edit)
+    if len(edits) > 2 * EDIT_HISTORY: del edits[:-EDIT_HISTORY] # Trimmed in batches
+
+def _edits_since(collection, version):
+    """Shared Inventory/Spellbook edits_since()."""
+    behind = collection.version - version
+    edits = collection._edits
+    if behind < 0 or behind > len(edits): return None
+    return edits[len(edits) - behind:]
+
+class Inventory(list):
+    """Inventory rows ([name, qty] lists, in display order) with a name index.
+
+    It is still the list of [name, qty] rows the .pqw format stores, but the
+    index maps each name to its row position, so lookups by name are O(1) and
+    the non-Gold cubit total used for encumbrance is kept up to date on every
+    change. A removal only marks the positions after it as stale; they are
+    renumbered in one pass the next time one of them is needed. Names changed
+    since the last take_changes() are remembered for the save journal, and the
+    latest row edits for views (see edits_since()).
+    """
+    __slots__ = ("_index", "_valid", "cubits", "_changes", "version", "_edits")
+
+    def __init__(self, rows=()):
+        super().__init__()
+        self._index = {} # name -> position (exact below _valid)
+        self._valid = 0 # Positions from here on may be stale after a removal
+        self.cubits = 0 # Total quantity of everything but Gold
+        self._changes = {} # name -> whether its row was removed, in order of last append
+        self.version = 0 # Row edits so far
+        self._edits = [] # (op, row, name): op is "set", "append" or "remove"
+        for name, qty in rows:
+            i = self._index.get(name)
+            if i is not None: # Merge duplicate rows from hand-edited saves
+                self[i][1] += qty
+            else:
+                self._append_row(name, qty)
+            if name != "Gold":
+                self.cubits += qty
+
+    def _position(self, name):
+        """Row position of an item (None if absent), renumbering stale positions first."""
+        i = self._index.get(name)
+        if i is None or i < self._valid: return i
+        index = self._index
+        for j in range(self._valid, len(self)):
+            index[self[j][0]] = j
+        self._valid = len(self)
+        return index[name]
+
+    def _append_row(self, name, qty):
+        row = [name, qty]
+        if self._valid == len(self): self._valid += 1
+        self._index[name] = len(self)
+        self.append(row)
+        return row
+
+    def _remove_row(self, name):
+        """Delete an item's row by position; returns the row."""
+        i = self._position(name)
+        del self._index[name]
+        row = self.pop(i)
+        self._valid = min(self._valid, i)
+        return row
+
+    def qty(self, name):
+        """Quantity of an item (0 if absent)."""
+        i = self._position(name)
+        return self[i][1] if i is not None else 0
+
+    def index_of(self, name):
+        """Display position of an item (-1 if absent)."""
+        i = self._position(name)
+        return i if i is not None else -1
+
+    def add(self, name, quantity):
+        """Add or remove quantity; rows that drop to 0 or less are removed."""
+        i = self._position(name)
+        if i is not None:
+            row = self[i]
+            new_qty = row[1] + quantity
+            if new_qty > 0:
+                row[1] = new_qty
+                delta = quantity
+                self._changes.setdefault(name, False)
+                _record_edit(self, ("set", i, name))
+            else:
+                delta = -row[1]
+                self._remove_row(name)
+                self._changes[name] = True
+                _record_edit(self, ("remove", i, name))
+        elif quantity > 0:
+            _record_edit(self, ("append", len(self), name))
+            self._append_row(name, quantity)
+            delta = quantity
+            self._changes[name] = self._changes.pop(name, False) # Appended rows replay in order
+        else:
+            return
+        if name != "Gold":
+            self.cubits += delta
+
+    def edits_since(self, version):
+        """Row edits ((op, row, name), oldest first) made after `version`, or
+        None if the caller is too far behind. Each row position is as of that
+        edit; "set" rows only changed quantity."""
+        return _edits_since(self, version)
+
+    def take_changes(self):
+        """[[name, qty, removed], ...] for items changed since the last call.
+
+        qty is the current quantity (0 if gone); `removed` means the old row
+        was dropped at some point, so a re-added item goes to the end.
+        """
+        changes = [[name, self.qty(name), removed] for name, removed in self._changes.items()]
+        self._changes.clear()
+        return changes
+
+    def apply_changes(self, changes):
+        """Replay take_changes() output onto this inventory."""
+        for name, qty, removed in changes:
+            i = self._position(name)
+            row = self[i] if i is not None else None
+            if row is not None and (removed or qty <= 0):
+                self._remove_row(name)
+                if name != "Gold": self.cubits -= row[1]
+                row = None
+                _record_edit(self, ("remove", i, name))
+            if qty <= 0: continue
+            if row is None:
+                _record_edit(self, ("append", len(self), name))
+                row = self._append_row(name, 0)
+            else:
+                _record_edit(self, ("set", i, name))
+            if name != "Gold": self.cubits += qty - row[1]
+            row[1] = qty
+
+    def first_non_gold(self):
+        """First non-Gold row in display order, or None."""
+        for row in self:
+            if row[0] != "Gold":
+                return row
+        return None
+
+    def non_gold_count(self):
+        return len(self) - ("Gold" in self._index)
+
+    def non_gold_at(self, k):
+        """The k-th non-Gold row in display order."""
+        gold = self._position("Gold")
+        if gold is None or k < gold:
+            return self[k]
+        return self[k + 1]
+
+def get_inventory(game_state):
+    """Return the character's Inventory."""
+    return game_state.Inventory
+
+
+# --- Spell Book ---
+
+class Spellbook:
+    """Spells sorted by name with integer levels and an up-to-date best spell.
+
+    Iterates as [name, roman_level] rows like the .pqw `Spells` list; Roman
+    numerals are only rendered when a row is read (and cached until the level
+    changes). The JS "best spell" heuristic, (index+1)*level, is maintained
+    as spells are added or improved. Like Inventory, it remembers its latest
+    row edits for views (see edits_since()).
+    """
+    __slots__ = ("_names", "_levels", "_romans", "best_index", "best_score", "version", "_edits")
+
+    def __init__(self, rows=()):
+        self._names = [] # Sorted alphabetically
+        self._levels = []
+        self._romans = [] # Rendered level, None until needed
+        self.best_index = -1
+        self.best_score = -1
+        self.version = 0 # Row edits so far
+        self._edits = [] # (op, row, name): op is "set" or "insert"
+        for name, level_roman in rows:
+            if name in self: continue # Keep the first of any duplicates
+            i = bisect.bisect_left(self._names, name)
+            self._names.insert(i, name)
+            self._levels.insert(i, to_arabic(level_roman))
+            self._romans.insert(i, None)
+        self._rescan_best()
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        i = bisect.bisect_left(self._names, name)
+        return i < len(self._names) and self._names[i] == name
+
+    def __iter__(self):
+        for i in range(len(self._names)):
+            yield [self._names[i], self.roman(i)]
+
+    def roman(self, i):
+        """Roman numeral level of the spell at position i."""
+        roman = self._romans[i]
+        if roman is None:
+            roman = self._romans[i] = to_roman(self._levels[i])
+        return roman
+
+    def level(self, name):
+        """Integer level of a spell (0 if unknown)."""
+        i = bisect.bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            return self._levels[i]
+        return 0
+
+    def add(self, name, level_increment=1):
+        """Learn a spell or raise its level; returns its new level."""
+        i = bisect.bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            self._levels[i] += level_increment
+            self._romans[i] = None
+            score = (i + 1) * self._levels[i]
+            if level_increment < 0 and i == self.best_index:
+                self._rescan_best()
+            elif score > self.best_score or (score == self.best_score and i < self.best_index):
+                self.best_index, self.best_score = i, score
+            op = "set"
+        else:
+            self._names.insert(i, name)
+            self._levels.insert(i, level_increment)
+            self._romans.insert(i, None)
+            self._rescan_best() # Every spell after i moved down one slot
+            op = "insert"
+        _record_edit(self, (op, i, name))
+        return self._levels[i]
+
+    def edits_since(self, version):
+        """Row edits ((op, row, name), oldest first) made after `version`, or
+        None if the caller is too far behind."""
+        return _edits_since(self, version)
+
+    def _rescan_best(self):
+        self.best_index, self.best_score = -1, -1
+        for i, level in enumerate(self._levels):
+            score = (i + 1) * level
+            if score > self.best_score:
+                self.best_index, self.best_score = i, score
+
+    def best_string(self):
+        """The 'best' spell string, e.g. "Slime Finger IV" ("" if none)."""
+        if self.best_index == -1: return ""
+        return f"{self._names[self.best_index]} {self.roman(self.best_index)}"
+
+    def to_list(self):
+        """Serializable [[name, roman_level], ...] list for the .pqw format."""
+        return list(self)
+
+def get_spellbook(game_state):
+    """Return the character's Spellbook."""
+    return game_state.Spells
+
+
 # --- Game State Manipulation ---
 
 def _log_event(game_state, message):
     """Add an event to the game log."""
-    if "log" not in game_state:
-        game_state["log"] = {}
-    game_state["log"][time.time()] = message
+    game_state.log.add(message)
 
 def get_trait(game_state, trait_name):
     """Get a specific trait value."""
-    return game_state.get("Traits", {}).get(trait_name, "")
+    return game_state.Traits.get(trait_name, "")
 
 def get_trait_i(game_state, trait_name):
     """Get a specific trait value as integer."""
-    return str_to_int_def(get_trait(game_state, trait_name))
+    value = game_state.Traits.get(trait_name, "")
+    return value if type(value) is int else str_to_int_def(value) # Level is already an int
 
 def get_stat(game_state, stat_name):
     """Get a specific stat value."""
-    return game_state.get("Stats", {}).get(stat_name, 0)
+    return game_state.Stats.get(stat_name, 0)
 
 def get_equip(game_state, equip_slot):
     """Get equipment in a specific slot."""
-    return game_state.get("Equips", {}).get(equip_slot, "")
+    return game_state.Equips.get(equip_slot, "")
 
 def get_inventory_item_qty(game_state, item_name):
     """Get quantity of a specific item in inventory."""
-    inventory = game_state.get("Inventory", [])
-    for item, qty in inventory:
-        if item == item_name:
-            return qty
-    return 0
+    return get_inventory(game_state).qty(item_name)
 
 def get_spell_level(game_state, spell_name):
     """Get the Roman numeral level of a specific spell."""
-    spells = game_state.get("Spells", [])
-    for name, level_roman in spells:
-        if name == spell_name:
-            return level_roman
-    return ""
+    level = get_spellbook(game_state).level(spell_name)
+    return to_roman(level) if level else ""
 
 def get_spell_level_i(game_state, spell_name):
     """Get the integer level of a specific spell."""
-    return to_arabic(get_spell_level(game_state, spell_name))
+    return get_spellbook(game_state).level(spell_name)
+
 
+def mark_changed(game_state, section):
+    """Bump a section's version (see GameState.versions) and, for the
+    JOURNAL_SECTIONS, queue it for the next journal record."""
+    game_state.versions[section] += 1
+    if section in JOURNAL_SECTIONS: game_state.changed.add(section)
 
 def update_trait(game_state, trait_name, value):
     """Update a trait value."""
-    if "Traits" not in game_state: game_state["Traits"] = {}
-    game_state["Traits"][trait_name] = value
+    game_state.Traits[trait_name] = value
+    mark_changed(game_state, "Traits")
 
 def update_stat(game_state, stat_name, value):
     """Update a stat value."""
-    if "Stats" not in game_state: game_state["Stats"] = {}
-    game_state["Stats"][stat_name] = value
+    game_state.Stats[stat_name] = value
+    mark_changed(game_state, "Stats")
     if stat_name == 'STR': # Update encumbrance max if STR changes
         update_bar_max(game_state, "EncumBar", 10 + value)
 
@@ -609,38 +1109,20 @@ def add_stat(game_state, stat_name, amount):
 
 def update_equip(game_state, equip_slot, item_name):
     """Update equipment in a slot."""
-    if "Equips" not in game_state: game_state["Equips"] = {}
-    game_state["Equips"][equip_slot] = item_name
-    game_state["bestequip"] = find_best_equip_string(game_state) # Recalculate best equip
+    game_state.Equips[equip_slot] = item_name
+    mark_changed(game_state, "Equips")
+    game_state.bestequip = find_best_equip_string(game_state) # Recalculate best equip
 
 def find_inventory_item_index(game_state, item_name):
     """Find the index of an item in the inventory list."""
-    inventory = game_state.get("Inventory", [])
-    for i, (name, qty) in enumerate(inventory):
-        if name == item_name:
-            return i
-    return -1
+    return get_inventory(game_state).index_of(item_name)
 
 def add_inventory(game_state, item_name, quantity):
     """Add or remove quantity of an item from inventory. Updates encumbrance."""
     if not quantity: return # No change
-    if "Inventory" not in game_state: game_state["Inventory"] = [['Gold', 0]]
-
-    inventory = game_state["Inventory"]
-    index = find_inventory_item_index(game_state, item_name)
-
-    current_qty = 0
-    if index != -1:
-        current_qty = inventory[index][1]
-        new_qty = current_qty + quantity
-        if new_qty > 0:
-            inventory[index][1] = new_qty
-        else:
-            # Remove item if quantity drops to 0 or less
-            del inventory[index]
-    elif quantity > 0:
-        # Add new item if it doesn't exist and quantity is positive
-        inventory.append([item_name, quantity])
+    # Items that drop to 0 or less are removed; new items are appended
+    get_inventory(game_state).add(item_name, quantity)
+    mark_changed(game_state, "Inventory")
 
     # Log gain/loss
     verb = "Gained" if quantity > 0 else "Lost"
@@ -655,12 +1137,7 @@ def add_inventory(game_state, item_name, quantity):
 
 def update_encumbrance(game_state):
     """Recalculate and update encumbrance bar based on inventory."""
-    inventory = game_state.get("Inventory", [])
-    cubits = 0
-    # Skip Gold for encumbrance calculation
-    for item_name, qty in inventory:
-        if item_name != "Gold":
-            cubits += qty
+    cubits = get_inventory(game_state).cubits # Running non-Gold total
     # Encumbrance max depends on STR
     enc_max = 10 + get_stat(game_state, 'STR')
     update_bar_max(game_state, "EncumBar", enc_max)
@@ -669,24 +1146,13 @@ def update_encumbrance(game_state):
 
 def add_spell(game_state, spell_name, level_increment=1):
     """Add a spell or increase its level."""
-    if "Spells" not in game_state: game_state["Spells"] = []
-    spells = game_state["Spells"]
-    found = False
-    for i, (name, level_roman) in enumerate(spells):
-        if name == spell_name:
-            current_level = to_arabic(level_roman)
-            new_level = current_level + level_increment
-            spells[i][1] = to_roman(new_level)
-            found = True
-            break
-    if not found:
-        spells.append([spell_name, to_roman(level_increment)])
-
-    spells.sort(key=lambda x: x[0]) # Keep spells sorted alphabetically
-    game_state["bestspell"] = find_best_spell_string(game_state) # Recalculate
+    spellbook = get_spellbook(game_state) # Kept sorted alphabetically
+    new_level = spellbook.add(spell_name, level_increment)
+    mark_changed(game_state, "Spells")
+    game_state.bestspell = spellbook.best_string() # Maintained incrementally
 
     # Log
-    _log_event(game_state, f"Learned/Improved {spell_name} to level {get_spell_level(game_state, spell_name)}")
+    _log_event(game_state, f"Learned/Improved {spell_name} to level {to_roman(new_level)}")
 
 
 def find_best_equip_string(game_state):
@@ -694,32 +1160,13 @@ def find_best_equip_string(game_state):
     # The JS version just stored the *last* generated equip name. Let's mimic that.
     # The `update_equip` function will call this, so we return the last set non-empty equip.
     # We'll rely on the `bestequip` field updated during `win_equip`.
-    return game_state.get("bestequip", "Sharp Rock")
+    return game_state.bestequip
 
 
 def find_best_spell_string(game_state):
     """Find the 'best' spell string (JS heuristic: (index+1)*level)."""
-    spells = game_state.get("Spells", [])
-    if not spells: return ""
-
-    best_score = -1
-    best_index = -1
-    flat = 1 # Flattening constant from JS
-
-    # Ensure spells are sorted alphabetically first, as JS likely iterated over the displayed list
-    spells.sort(key=lambda x: x[0])
-
-    for i, (name, level_roman) in enumerate(spells):
-        level = to_arabic(level_roman)
-        score = (i + flat) * level
-        if score > best_score:
-            best_score = score
-            best_index = i
-
-    if best_index != -1:
-        best_name, best_level_roman = spells[best_index]
-        return f"{best_name} {best_level_roman}"
-    return ""
+    # The Spellbook keeps the best index up to date as spells change
+    return get_spellbook(game_state).best_string()
 
 def find_best_stat_string(game_state):
     """Find the highest prime stat and return its string representation."""
@@ -737,129 +1184,269 @@ def find_best_stat_string(game_state):
 
 # --- Progress Bar Handling ---
 
+BAR_KEYS = ["ExpBar", "EncumBar", "PlotBar", "QuestBar", "TaskBar"]
+
+class Bar:
+    """Progress bar: position and max, with the display fields derived lazily.
+
+    percent, remaining, time and hint are only worked out when read, then
+    cached until the next set_position/set_max (always change a bar through
+    those). Round-trips to the bar dicts stored in .pqw files via
+    to_dict/from_dict.
+    """
+    __slots__ = ("kind", "position", "max", "_dirty", "_percent", "_remaining", "_time", "_hint")
+
+    def __init__(self, kind, bar_max=0, position=0):
+        self.kind = kind # "Exp", "Encum", "Plot", "Quest" or "Task"
+        self.max = bar_max
+        self.position = 0
+        self._percent, self._remaining, self._time, self._hint = 0, 0, "", ""
+        self.set_position(position)
+
+    @classmethod
+    def from_dict(cls, kind, data):
+        """Build a Bar from a .pqw bar dict (derived fields are recomputed)."""
+        return cls(kind, data.get('max', 0), data.get('position', 0))
+
+    def to_dict(self):
+        """The .pqw bar dict, derived fields included."""
+        return {"position": self.position, "max": self.max, "percent": self.percent,
+                "remaining": self.remaining, "time": self.time, "hint": self.hint}
+
+    def set_position(self, new_position):
+        bar_max = self.max if self.max > 0 else 1 # Avoid division by zero
+        self.position = min(new_position, bar_max)
+        self._dirty = True
+
+    def set_max(self, new_max):
+        self.max = new_max
+        # Re-clamp the position against the new max
+        self.set_position(self.position)
+
+    def increment(self, amount):
+        self.set_position(self.position + amount)
+
+    def done(self):
+        return self.position >= self.max
+
+    def _refresh(self):
+        """Recompute the UI fields (matches the JS templates)."""
+        kind = self.kind
+        bar_max = self.max if self.max > 0 else 1
+        self._percent = int(div_floor(100 * self.position, bar_max))
+        remaining_val = bar_max - self.position
+
+        if kind in ("Plot", "Exp"): # Time-based bars
+            self._remaining = math.floor(remaining_val)
+            self._time = rough_time(self._remaining)
+        elif kind in ("Quest", "Encum"): # Quests and encumbrance don't show time
+            self._remaining = math.floor(remaining_val)
+            self._time = ""
+        else: # TaskBar just uses percent
+            self._remaining = 0
+            self._time = ""
+
+        if kind == "Exp":
+            self._hint = f"{self._remaining} XP needed for next level"
+        elif kind == "Encum":
+            self._hint = f"{int(self.position)}/{int(bar_max)} cubits"
+        elif kind == "Plot":
+            self._hint = f"{self._time} remaining"
+        elif kind == "Quest":
+            self._hint = f"{self._percent}% complete"
+        elif kind == "Task":
+            self._hint = f"{self._percent}%" # Taskbar just shows percentage in JS hint too
+        else:
+            self._hint = ""
+        self._dirty = False
+
+    @property
+    def percent(self):
+        if self._dirty: self._refresh()
+        return self._percent
+
+    @property
+    def remaining(self):
+        if self._dirty: self._refresh()
+        return self._remaining
+
+    @property
+    def time(self):
+        if self._dirty: self._refresh()
+        return self._time
+
+    @property
+    def hint(self):
+        if self._dirty: self._refresh()
+        return self._hint
+
+def get_bar(game_state, bar_id):
+    """Return a progress Bar by "Exp" or "ExpBar" style id."""
+    return getattr(game_state, bar_id if bar_id.endswith("Bar") else f"{bar_id}Bar")
+
 def update_bar_max(game_state, bar_id, new_max):
     """Set the maximum value for a progress bar."""
-    bar_id = bar_id.replace("Bar", "") # Normalize ID
-    bar_key = f"{bar_id}Bar"
-    if bar_key not in game_state: game_state[bar_key] = {}
-    game_state[bar_key]['max'] = new_max
-    # Re-calculate dependent fields after changing max
-    set_bar_position(game_state, bar_key, game_state[bar_key].get('position', 0))
+    get_bar(game_state, bar_id).set_max(new_max)
 
 def set_bar_position(game_state, bar_id, new_position):
-    """Set the current position for a progress bar and update related fields."""
-    bar_id = bar_id.replace("Bar", "") # Normalize ID
-    bar_key = f"{bar_id}Bar"
-    if bar_key not in game_state: game_state[bar_key] = {}
-
-    bar = game_state[bar_key]
-    bar_max = bar.get('max', 1) # Avoid division by zero
-    if bar_max <= 0: bar_max = 1
-
-    bar['position'] = min(new_position, bar_max)
-
-    # Update calculated fields for UI
-    bar['percent'] = int(div_floor(100 * bar['position'], bar_max))
-    remaining_val = bar_max - bar['position']
-
-    if bar_id in ["Plot", "Exp"]: # Time-based bars
-        bar['remaining'] = math.floor(remaining_val)
-        bar['time'] = rough_time(bar['remaining'])
-    elif bar_id == "Quest":
-        bar['remaining'] = math.floor(remaining_val) # Or just use percent?
-        bar['time'] = "" # Quests don't show time
-    elif bar_id == "Encum":
-         bar['remaining'] = math.floor(remaining_val)
-         bar['time'] = "" # Encumbrance doesn't show time
-    else: # TaskBar just uses percent
-        bar['remaining'] = 0
-        bar['time'] = ""
-
-
-    # Update hint string based on bar type (matches JS templates)
-    if bar_id == "Exp":
-        bar['hint'] = f"{bar['remaining']} XP needed for next level"
-    elif bar_id == "Encum":
-        bar['hint'] = f"{int(bar['position'])}/{int(bar_max)} cubits"
-    elif bar_id == "Plot":
-        bar['hint'] = f"{bar['time']} remaining"
-    elif bar_id == "Quest":
-        bar['hint'] = f"{bar['percent']}% complete"
-    elif bar_id == "Task":
-         bar['hint'] = f"{bar['percent']}%" # Taskbar just shows percentage in JS hint too
-    else:
-        bar['hint'] = ""
+    """Set the current position for a progress bar (UI fields update lazily)."""
+    get_bar(game_state, bar_id).set_position(new_position)
 
 def increment_bar(game_state, bar_id, increment):
     """Increment a progress bar's position."""
-    bar_key = f"{bar_id}Bar" if not bar_id.endswith("Bar") else bar_id
-    current_pos = game_state.get(bar_key, {}).get('position', 0)
-    set_bar_position(game_state, bar_key, current_pos + increment)
+    get_bar(game_state, bar_id).increment(increment)
 
 def is_bar_done(game_state, bar_id):
     """Check if a progress bar is full."""
-    bar_key = f"{bar_id}Bar" if not bar_id.endswith("Bar") else bar_id
-    bar = game_state.get(bar_key, {})
-    return bar.get('position', 0) >= bar.get('max', 1)
+    return get_bar(game_state, bar_id).done()
+
+
+# --- Game State Model ---
+
+# Runtime-only game state entries that never go into a .pqw file
+TRANSIENT_KEYS = ("rng", "changed", "versions", "quests_trimmed")
+
+class GameState:
+    """A character's state: one slot per .pqw field plus the runtime PRNG.
+
+    Slots are named after the .pqw keys, so to_pqw_dict/from_pqw_dict map
+    field for field. Fields hold the engine's own types (Bar, Inventory,
+    Spellbook, EventLog) and numbers stay numbers; Traits["Level"] is an
+    int rather than whatever the save file had. Keys the schema doesn't
+    know are kept in `extra` and written back out unchanged. `changed` holds
+    the JOURNAL_SECTIONS modified since the last save or journal record.
+    `versions` counts changes per section (the JOURNAL_SECTIONS, Inventory
+    and act) for as long as the state lives, so the UI can skip what it has
+    already shown; bars and scalar fields are cheap enough to compare.
+    `quests_trimmed` counts the quests dropped from the front of Quests, so
+    the UI can tell a trimmed quest from one it hasn't seen.
+    `state["act"]` and `state.get("act")` still work for dict-style callers.
+    """
+    __slots__ = tuple(DEFAULT_SAVE_SCHEMA) + TRANSIENT_KEYS + ("extra",)
+
+    def __init__(self):
+        for key, default in DEFAULT_SAVE_SCHEMA.items():
+            setattr(self, key, copy.deepcopy(default))
+        for bar_key in BAR_KEYS:
+            setattr(self, bar_key, Bar.from_dict(bar_key[:-3], getattr(self, bar_key)))
+        self.Inventory = Inventory(self.Inventory)
+        self.Spells = Spellbook()
+        self.log = make_event_log(self)
+        self.rng = None
+        self.changed = set()
+        self.versions = Counter()
+        self.quests_trimmed = 0
+        self.extra = {}
+
+    @classmethod
+    def from_pqw_dict(cls, data):
+        """Build a GameState from a decoded .pqw dict; missing fields get schema defaults."""
+        state = cls.__new__(cls)
+        for key, default in DEFAULT_SAVE_SCHEMA.items():
+            value = data[key] if key in data else copy.deepcopy(default)
+            if isinstance(value, dict): value = dict(value) # Don't share containers with `data`
+            elif isinstance(value, list): value = list(value)
+            setattr(state, key, value)
+        state.Traits["Level"] = str_to_int_def(state.Traits.get("Level", 0))
+        for bar_key in BAR_KEYS:
+            setattr(state, bar_key, Bar.from_dict(bar_key[:-3], getattr(state, bar_key)))
+        state.Inventory = Inventory(state.Inventory)
+        state.Spells = Spellbook(state.Spells)
+        state.log = make_event_log(state, state.log)
+        state.rng = None
+        state.changed = set()
+        state.versions = Counter()
+        state.quests_trimmed = 0
+        state.extra = {k: v for k, v in data.items() if k not in DEFAULT_SAVE_SCHEMA}
+        return state
+
+    def to_pqw_dict(self):
+        """Return the plain dict the .pqw format expects (rng left out)."""
+        data = {key: getattr(self, key) for key in DEFAULT_SAVE_SCHEMA}
+        data["Spells"] = self.Spells.to_list() # Render Roman numeral levels
+        for bar_key in BAR_KEYS:
+            data[bar_key] = data[bar_key].to_dict()
+        if self.log.store is not None: data["log"] = {} # Kept in the log store
+        data.update(self.extra)
+        return data
+
+    # Dict-style access, limited to the .pqw fields and rng
+    def __getitem__(self, key):
+        if key not in _STATE_FIELDS: raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in _STATE_FIELDS: raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _STATE_FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _STATE_FIELDS else default
+
+_STATE_FIELDS = frozenset(DEFAULT_SAVE_SCHEMA) | frozenset(TRANSIENT_KEYS)
 
 
 # --- Task Queue ---
 
 def add_task_to_queue(game_state, task_string):
     """Add a task string (e.g., 'task|duration|description') to the queue."""
-    if "queue" not in game_state: game_state["queue"] = []
-    game_state["queue"].append(task_string)
+    game_state.queue.append(task_string)
 
 def dequeue_task(game_state):
     """Get and remove the next task from the queue. Returns None if empty."""
-    if game_state.get("queue"):
-        return game_state["queue"].pop(0)
+    if game_state.queue:
+        return game_state.queue.pop(0)
     return None
 
 def set_current_task(game_state, description, duration_msec, internal_task_id=""):
     """Set the current task, resetting the TaskBar."""
-    game_state["kill"] = description + "..."
-    game_state["task"] = internal_task_id # Store the internal ID for task completion logic
-    _log_event(game_state, game_state["kill"])
+    game_state.kill = description + "..."
+    game_state.task = internal_task_id # Store the internal ID for task completion logic
+    _log_event(game_state, game_state.kill)
     update_bar_max(game_state, "TaskBar", duration_msec)
     set_bar_position(game_state, "TaskBar", 0)
 
 # --- Item/Monster Generation ---
 
-def boring_item():
-    return Pick(BORING_ITEMS)
+def boring_item(rng=None):
+    return (rng or _alea).pick(BORING_ITEMS)
 
-def interesting_item():
-    return Pick(ITEM_ATTRIB) + ' ' + Pick(SPECIALS)
+def interesting_item(rng=None):
+    rng = rng or _alea
+    return rng.pick(ITEM_ATTRIB) + ' ' + rng.pick(SPECIALS)
 
-def special_item():
-    return interesting_item() + ' of ' + Pick(ITEM_OFS)
+def special_item(rng=None):
+    rng = rng or _alea
+    return interesting_item(rng) + ' of ' + rng.pick(ITEM_OFS)
 
-def win_item(game_state):
+def win_item(game_state, rng=None):
     """Adds a random item to inventory."""
-    inventory = game_state.get("Inventory", [])
+    rng = rng or get_rng(game_state)
+    inventory = get_inventory(game_state)
     # JS logic: if inv length > max(250, rand(999)), pick existing, else new special
-    threshold = max(250, Random(1000)) # JS rand(999) is 0-998, so use 1000
+    threshold = max(250, rng.random_int(1000)) # JS rand(999) is 0-998, so use 1000
     if len(inventory) > threshold and len(inventory) > 1:
         # Pick existing non-gold item name
-        non_gold_items = [item[0] for item in inventory if item[0] != "Gold"]
-        if non_gold_items:
-            item_name = Pick(non_gold_items)
+        non_gold_count = inventory.non_gold_count()
+        if non_gold_count:
+            item_name = inventory.non_gold_at(rng.random_int(non_gold_count))[0]
             add_inventory(game_state, item_name, 1)
         else: # Only gold exists, add a special item
-            add_inventory(game_state, special_item(), 1)
+            add_inventory(game_state, special_item(rng), 1)
     else:
-        add_inventory(game_state, special_item(), 1)
+        add_inventory(game_state, special_item(rng), 1)
 
 
-def _lpick(item_list, goal_level):
+def _lpick(item_list, goal_level, rng):
     """Pick item from list closest to goal_level (like JS LPick)."""
     if not item_list: return None
-    result_item = Pick(item_list)
+    result_item = rng.pick(item_list)
     best_diff = abs(goal_level - result_item[1]) # item_list expected [(name, level), ...]
 
     for _ in range(5): # Check 5 more times
-        candidate = Pick(item_list)
+        candidate = rng.pick(item_list)
         diff = abs(goal_level - candidate[1])
         if diff < best_diff:
             result_item = candidate
@@ -867,10 +1454,11 @@ def _lpick(item_list, goal_level):
     return result_item
 
 
-def win_equip(game_state):
+def win_equip(game_state, rng=None):
     """Generates and equips a random piece of equipment suitable for the level."""
+    rng = rng or get_rng(game_state)
     level = get_trait_i(game_state, 'Level')
-    posn = Random(len(EQUIPS)) # 0 = Weapon, 1 = Shield, 2+ = Armor slots
+    posn = rng.random_int(len(EQUIPS)) # 0 = Weapon, 1 = Shield, 2+ = Armor slots
 
     if posn == 0: # Weapon
         equip_slot = EQUIPS[posn]
@@ -889,7 +1477,7 @@ def win_equip(game_state):
         worse_attribs = DEFENSE_BAD
 
     # Pick base item closest to player level
-    chosen_base = _lpick(base_items, level)
+    chosen_base = _lpick(base_items, level, rng)
     if not chosen_base: return
     base_name, base_qual = chosen_base
 
@@ -937,31 +1525,33 @@ def win_equip(game_state):
         current_name = prefix + ' ' + current_name
 
     update_equip(game_state, equip_slot, current_name)
-    game_state["bestequip"] = current_name # Store this as the latest generated item
+    game_state.bestequip = current_name # Store this as the latest generated item
 
 
-def win_spell(game_state):
+def win_spell(game_state, rng=None):
     """Adds a random spell, favoring lower index spells (JS RandomLow)."""
+    rng = rng or get_rng(game_state)
     wis = get_stat(game_state, 'WIS')
     level = get_trait_i(game_state, 'Level')
     max_spell_index = min(wis + level, len(SPELLS))
     if max_spell_index > 0:
-         spell_index = RandomLow(max_spell_index)
+         spell_index = rng.random_low(max_spell_index)
          add_spell(game_state, SPELLS[spell_index], 1)
 
 
-def win_stat(game_state):
+def win_stat(game_state, rng=None):
     """Increases a random stat, favoring the current highest stat."""
-    if Random(2) == 0:
+    rng = rng or get_rng(game_state)
+    if rng.random_int(2) == 0:
         # Pick any stat (including HP/MP Max)
-        stat_to_increase = Pick(STATS)
+        stat_to_increase = rng.pick(STATS)
     else:
         # Favor prime stats based on squared value (like JS)
         total_sq = sum(get_stat(game_state, s)**2 for s in PRIME_STATS)
         if total_sq <= 0: # Handle case where all stats are 0
-            stat_to_increase = Pick(PRIME_STATS)
+            stat_to_increase = rng.pick(PRIME_STATS)
         else:
-            roll = Random(total_sq)
+            roll = rng.random_int(total_sq)
             current_sum = 0
             stat_to_increase = PRIME_STATS[-1] # Default to last if loop fails
             for s in PRIME_STATS:
@@ -972,13 +1562,14 @@ def win_stat(game_state):
     add_stat(game_state, stat_to_increase, 1)
 
 
-def named_monster(game_state, target_level):
+def named_monster(game_state, target_level, rng=None):
     """Generate a named monster close to the target level."""
+    rng = rng or get_rng(game_state)
     best_monster_info = None
     min_diff = float('inf')
 
     for _ in range(5): # Check 5 monsters
-        monster_tuple = Pick(MONSTERS)
+        monster_tuple = rng.pick(MONSTERS)
         m_name, m_level, m_loot = monster_tuple
         diff = abs(target_level - m_level)
         if best_monster_info is None or diff < min_diff:
@@ -987,28 +1578,30 @@ def named_monster(game_state, target_level):
 
     if best_monster_info:
         m_name, m_level, m_loot = best_monster_info
-        return f"{generate_name()} the {m_name}"
+        return f"{generate_name(rng)} the {m_name}"
     return "a generic foe" # Fallback
 
 
-def impressive_guy(game_state):
+def impressive_guy(game_state, rng=None):
     """Generate a name for an impressive NPC."""
-    if Random(2) == 0:
-        race_name = plural(Pick(RACES)[0])
-        title = Pick(IMPRESSIVE_TITLES)
+    rng = rng or get_rng(game_state)
+    if rng.random_int(2) == 0:
+        race_name = plural(rng.pick(RACES)[0])
+        title = rng.pick(IMPRESSIVE_TITLES)
         return f"the {title} of the {race_name}"
     else:
-        title = Pick(IMPRESSIVE_TITLES)
-        return f"{title} {generate_name()} of {generate_name()}"
+        title = rng.pick(IMPRESSIVE_TITLES)
+        return f"{title} {generate_name(rng)} of {generate_name(rng)}"
 
 
-def monster_task(game_state):
+def monster_task(game_state, rng=None):
     """Generates the next monster encounter task."""
+    rng = rng or get_rng(game_state)
     level = get_trait_i(game_state, 'Level')
     # Adjust level slightly randomly (like JS loop)
     for _ in range(level):
-        if Random(5) < 2: # Odds(2,5)
-            level += RandSign()
+        if rng.random_int(5) < 2: # Odds(2,5)
+            level += rng.rand_sign()
     level = max(1, level) # Ensure level is at least 1
 
     target_level = level
@@ -1020,11 +1613,11 @@ def monster_task(game_state):
     monster_tuple = None
     min_diff = float('inf')
     # Check quest monster first? JS does: `if game.questmonster and Odds(1,4)`
-    if game_state.get("questmonster") and Random(4) == 0:
-         monster_tuple = game_state["questmonster"] # Use quest monster tuple
+    if game_state.questmonster and rng.random_int(4) == 0:
+         monster_tuple = game_state.questmonster # Use quest monster tuple
     else:
          for _ in range(5):
-              candidate = Pick(MONSTERS)
+              candidate = rng.pick(MONSTERS)
               diff = abs(target_level - candidate[1])
               if monster_tuple is None or diff < min_diff:
                    min_diff = diff
@@ -1039,7 +1632,7 @@ def monster_task(game_state):
     # Handle level disparity: quantity or modifiers
     if level_diff > 10 and base_level > 0:
         # Too weak, multiply quantity
-        qty = div_floor(target_level + Random(base_level), base_level)
+        qty = div_floor(target_level + rng.random_int(base_level), base_level)
         qty = max(1, qty)
         target_level = div_floor(target_level, qty) # Adjust effective level per monster
         level_diff = target_level - base_level # Recalculate diff for modifiers
@@ -1048,10 +1641,10 @@ def monster_task(game_state):
     elif level_diff < 0:
         # Apply negative modifiers (sick/young)
         i = 10 + level_diff # Range 0 to 9 for diff -10 to -1
-        mod1_strength = 5 - Random(abs(i) + 1) # Strength for first modifier (max 5)
+        mod1_strength = 5 - rng.random_int(abs(i) + 1) # Strength for first modifier (max 5)
         mod2_strength = level_diff - mod1_strength # Remaining difference
 
-        if Random(2) == 0: # Randomly pick order
+        if rng.random_int(2) == 0: # Randomly pick order
             current_name = sick_prefix(mod1_strength, young_prefix(mod2_strength, current_name))
         else:
             current_name = young_prefix(mod1_strength, sick_prefix(mod2_strength, current_name))
@@ -1059,10 +1652,10 @@ def monster_task(game_state):
     elif level_diff > 0 :
          # Apply positive modifiers (big/special)
          i = 10 - level_diff # Range 0 to 9 for diff 10 to 1
-         mod1_strength = 5 - Random(abs(i) + 1)
+         mod1_strength = 5 - rng.random_int(abs(i) + 1)
          mod2_strength = level_diff - mod1_strength
 
-         if Random(2) == 0:
+         if rng.random_int(2) == 0:
               current_name = big_prefix(mod1_strength, special_prefix(mod2_strength, current_name))
          else:
               current_name = special_prefix(mod1_strength, big_prefix(mod2_strength, current_name))
@@ -1086,60 +1679,62 @@ def monster_task(game_state):
 
 # --- Game Progression ---
 
-def complete_quest(game_state):
+def complete_quest(game_state, rng=None):
     """Complete the current quest and start a new one."""
-    quest_bar_max = 50 + Random(100)
+    rng = rng or get_rng(game_state)
+    quest_bar_max = 50 + rng.random_int(100)
     update_bar_max(game_state, "QuestBar", quest_bar_max)
     set_bar_position(game_state, "QuestBar", 0)
 
-    quests = game_state.get("Quests", [])
+    quests = game_state.Quests
     if quests:
-        _log_event(game_state, f"Quest completed: {game_state.get('bestquest', 'an unknown quest')}")
+        _log_event(game_state, f"Quest completed: {game_state.bestquest}")
         # Award reward
-        reward_func = Pick([win_spell, win_equip, win_stat, win_item])
-        reward_func(game_state) # Call the chosen reward function
+        reward_func = rng.pick([win_spell, win_equip, win_stat, win_item])
+        reward_func(game_state, rng) # Call the chosen reward function
 
     # Limit quest log length (like JS)
     while len(quests) >= 100: # JS used > 99
         quests.pop(0)
+        game_state.quests_trimmed += 1
 
     # Generate new quest
-    game_state["questmonster"] = None # Clear quest monster target
-    game_state["questmonsterindex"] = -1
+    game_state.questmonster = None # Clear quest monster target
+    game_state.questmonsterindex = -1
     caption = ""
-    quest_type = Random(5)
+    quest_type = rng.random_int(5)
 
     if quest_type == 0: # Exterminate
         level = get_trait_i(game_state, 'Level')
         best_monster = None
         min_diff = float('inf')
         for i in range(4): # Pick best of 4 for quest target
-            montag = Random(len(MONSTERS))
+            montag = rng.random_int(len(MONSTERS))
             m_tuple = MONSTERS[montag]
             diff = abs(m_tuple[1] - level)
             if best_monster is None or diff < min_diff:
                 min_diff = diff
                 best_monster = m_tuple
-                game_state["questmonsterindex"] = montag # Store index
+                game_state.questmonsterindex = montag # Store index
 
         if best_monster:
-            game_state["questmonster"] = best_monster # Store tuple (Name, Level, Loot)
+            game_state.questmonster = best_monster # Store tuple (Name, Level, Loot)
             caption = f"Exterminate {definite(best_monster[0], 2)}"
         else:
              caption = "Exterminate something nasty" # Fallback
 
     elif quest_type == 1: # Seek Item
-        caption = f"Seek {definite(interesting_item(), 1)}"
+        caption = f"Seek {definite(interesting_item(rng), 1)}"
     elif quest_type == 2: # Deliver Item
-        caption = f"Deliver this {boring_item()}"
+        caption = f"Deliver this {boring_item(rng)}"
     elif quest_type == 3: # Fetch Item
-        caption = f"Fetch me {indefinite(boring_item(), 1)}"
+        caption = f"Fetch me {indefinite(boring_item(rng), 1)}"
     elif quest_type == 4: # Placate Monster
         level = get_trait_i(game_state, 'Level')
         best_monster = None
         min_diff = float('inf')
         for i in range(2): # Pick best of 2 for placate target
-            m_tuple = Pick(MONSTERS)
+            m_tuple = rng.pick(MONSTERS)
             diff = abs(m_tuple[1] - level)
             if best_monster is None or diff < min_diff:
                 min_diff = diff
@@ -1153,48 +1748,52 @@ def complete_quest(game_state):
     if not caption: caption = "Do something heroic" # Ultimate fallback
 
     quests.append(caption)
-    game_state["bestquest"] = caption
+    mark_changed(game_state, "Quests")
+    game_state.bestquest = caption
     _log_event(game_state, f"Commencing quest: {caption}")
     # SaveGame() call removed, should be handled by main loop
 
 
-def complete_act(game_state):
+def complete_act(game_state, rng=None):
     """Complete the current act and start the next."""
-    game_state["act"] += 1
-    act_roman = to_roman(game_state["act"])
-    game_state["bestplot"] = f"Act {act_roman}"
+    rng = rng or get_rng(game_state)
+    game_state.act += 1
+    mark_changed(game_state, "act")
+    act_roman = to_roman(game_state.act)
+    game_state.bestplot = f"Act {act_roman}"
 
     # Calculate plot bar max for the new act
     # JS: 60 * 60 * (1 + 5 * game.act) -> 1 hour + 5 hours per act
-    plot_bar_max = 3600 * (1 + 5 * game_state["act"])
+    plot_bar_max = 3600 * (1 + 5 * game_state.act)
     update_bar_max(game_state, "PlotBar", plot_bar_max)
     set_bar_position(game_state, "PlotBar", 0)
 
     # Add act to plot list (like JS Plots.AddUI)
     # We don't need a separate plot list, bestplot tracks current
-    if game_state["act"] > 1: # Rewards only after Act I
-        win_item(game_state)
-        win_equip(game_state)
+    if game_state.act > 1: # Rewards only after Act I
+        win_item(game_state, rng)
+        win_equip(game_state, rng)
 
-    _log_event(game_state, f"Act Completed! Starting {game_state['bestplot']}")
+    _log_event(game_state, f"Act Completed! Starting {game_state.bestplot}")
     # Brag('a') call removed (online feature)
 
 
-def level_up(game_state):
+def level_up(game_state, rng=None):
     """Handle character leveling up."""
+    rng = rng or get_rng(game_state)
     current_level = get_trait_i(game_state, 'Level')
     update_trait(game_state, 'Level', current_level + 1)
 
     # Increase HP/MP Max
     con = get_stat(game_state, 'CON')
     intel = get_stat(game_state, 'INT')
-    add_stat(game_state, 'HP Max', div_floor(con, 3) + 1 + Random(4))
-    add_stat(game_state, 'MP Max', div_floor(intel, 3) + 1 + Random(4))
+    add_stat(game_state, 'HP Max', div_floor(con, 3) + 1 + rng.random_int(4))
+    add_stat(game_state, 'MP Max', div_floor(intel, 3) + 1 + rng.random_int(4))
 
     # Gain stats and spell
-    win_stat(game_state)
-    win_stat(game_state)
-    win_spell(game_state)
+    win_stat(game_state, rng)
+    win_stat(game_state, rng)
+    win_spell(game_state, rng)
 
     # Reset XP bar for the new level
     new_xp_max = level_up_time(current_level + 1)
@@ -1202,15 +1801,16 @@ def level_up(game_state):
     set_bar_position(game_state, "ExpBar", 0)
 
     # Update best stat string
-    game_state["beststat"] = find_best_stat_string(game_state)
+    game_state.beststat = find_best_stat_string(game_state)
 
     _log_event(game_state, f"Leveled up to Level {current_level + 1}!")
     # Brag('l') call removed
 
 
-def interplot_cinematic(game_state):
+def interplot_cinematic(game_state, rng=None):
     """Adds cinematic task sequences to the queue."""
-    choice = Random(3)
+    rng = rng or get_rng(game_state)
+    choice = rng.random_int(3)
     if choice == 0:
         add_task_to_queue(game_state, 'task|1000|Exhausted, you arrive at a friendly oasis in a hostile land')
         add_task_to_queue(game_state, 'task|2000|You greet old friends and meet new allies')
@@ -1218,12 +1818,12 @@ def interplot_cinematic(game_state):
         add_task_to_queue(game_state, 'task|1000|There is much to be done. You are chosen!')
     elif choice == 1:
         level = get_trait_i(game_state, 'Level')
-        nemesis = named_monster(game_state, level + 3)
+        nemesis = named_monster(game_state, level + 3, rng)
         add_task_to_queue(game_state, 'task|1000|Your quarry is in sight, but a mighty enemy bars your path!')
         add_task_to_queue(game_state, f'task|4000|A desperate struggle commences with {nemesis}')
-        s = Random(3)
-        for _ in range(Random(1 + game_state.get('act', 0) + 1)):
-            s += 1 + Random(2)
+        s = rng.random_int(3)
+        for _ in range(rng.random_int(1 + game_state.act + 1)):
+            s += 1 + rng.random_int(2)
             duration = 2000
             if s % 3 == 0: desc = f'Locked in grim combat with {nemesis}'
             elif s % 3 == 1: desc = f'{nemesis} seems to have the upper hand'
@@ -1232,10 +1832,10 @@ def interplot_cinematic(game_state):
         add_task_to_queue(game_state, f'task|3000|Victory! {nemesis} is slain! Exhausted, you lose consciousness')
         add_task_to_queue(game_state, 'task|2000|You awake in a friendly place, but the road awaits')
     elif choice == 2:
-        nemesis2 = impressive_guy(game_state)
+        nemesis2 = impressive_guy(game_state, rng)
         add_task_to_queue(game_state, f"task|2000|Oh sweet relief! You've reached the kind protection of {nemesis2}")
         add_task_to_queue(game_state, f'task|3000|There is rejoicing, and an unnerving encounter with {nemesis2} in private')
-        add_task_to_queue(game_state, f'task|2000|You forget your {boring_item()} and go back to get it')
+        add_task_to_queue(game_state, f'task|2000|You forget your {boring_item(rng)} and go back to get it')
         add_task_to_queue(game_state, "task|2000|What's this!? You overhear something shocking!")
         add_task_to_queue(game_state, f'task|2000|Could {nemesis2} be a dirty double-dealer?')
         add_task_to_queue(game_state, 'task|3000|Who can possibly be trusted with this news!? -- Oh yes, of course')
@@ -1244,16 +1844,17 @@ def interplot_cinematic(game_state):
     add_task_to_queue(game_state, 'plot|1000|Loading') # Duration 1 sec for loading
 
 
-def process_task_completion(game_state):
+def process_task_completion(game_state, rng=None):
     """Handles logic after the current task finishes."""
-    task_id = game_state.get("task", "")
+    rng = rng or get_rng(game_state)
+    task_id = game_state.task
 
     if task_id.startswith('kill|'):
         parts = task_id.split('|')
         if len(parts) == 4:
             monster_name, level_str, loot = parts[1], parts[2], parts[3]
             if loot == '*': # Special loot (like dragon hoard?) -> WinItem
-                win_item(game_state)
+                win_item(game_state, rng)
             elif loot: # Specific loot part
                 item_name = f"{monster_name.lower()} {loot.capitalize()}"
                 add_inventory(game_state, item_name, 1)
@@ -1262,7 +1863,7 @@ def process_task_completion(game_state):
         level = get_trait_i(game_state, 'Level')
         price = 5 * level**2 + 10 * level + 20
         add_inventory(game_state, 'Gold', -price)
-        win_equip(game_state)
+        win_equip(game_state, rng)
     elif task_id == 'sell':
         # Selling logic is handled within the dequeue loop now
         pass
@@ -1274,52 +1875,54 @@ def process_task_completion(game_state):
          pass
 
     # Task completed, clear internal task id
-    game_state["task"] = ""
+    game_state.task = ""
 
-def process_tick(game_state, elapsed_msec):
+def process_tick(game_state, elapsed_msec, rng=None):
     """Process one tick of game time."""
-    increment_bar(game_state, "TaskBar", elapsed_msec)
+    task_bar = game_state.TaskBar
+    task_bar.increment(elapsed_msec)
 
-    if not is_bar_done(game_state, "TaskBar"):
+    if not task_bar.done():
         return # Current task not finished
 
     # --- Task is Done ---
-    completed_task_duration = game_state.get("TaskBar", {}).get("max", 0)
-    game_state["tasks"] = game_state.get("tasks", 0) + 1
-    game_state["elapsed"] = game_state.get("elapsed", 0) + div_floor(completed_task_duration, 1000)
+    rng = rng or get_rng(game_state)
+    completed_task_duration = task_bar.max
+    game_state.tasks += 1
+    game_state.elapsed += div_floor(completed_task_duration, 1000)
 
-    process_task_completion(game_state)
+    finished_task = game_state.task # process_task_completion clears it
+    process_task_completion(game_state, rng)
 
     # Check for level up / quest / plot progression (only after kill tasks usually)
-    is_kill_task = game_state.get("task", "").startswith("kill|") # Check based on *previous* task id if needed
-                                                                 # For now, check if *next* task is likely kill
-    is_advancement_tick = is_kill_task or not game_state.get("act", 0) # Advance on kills or before Act 1
+    is_kill_task = finished_task.startswith("kill|")
+    is_advancement_tick = is_kill_task or not game_state.act # Advance on kills or before Act 1
 
     if is_advancement_tick:
         # Experience and Level Up
         if is_bar_done(game_state, "ExpBar"):
-            level_up(game_state)
+            level_up(game_state, rng)
         else:
             increment_bar(game_state, "ExpBar", div_floor(completed_task_duration, 1000))
 
         # Quest Progression (only after Act 0)
-        if game_state.get("act", 0) >= 1:
-            if not game_state.get("Quests"): # No quests yet? Start one.
-                complete_quest(game_state)
+        if game_state.act >= 1:
+            if not game_state.Quests: # No quests yet? Start one.
+                complete_quest(game_state, rng)
             elif is_bar_done(game_state, "QuestBar"):
-                 complete_quest(game_state)
+                 complete_quest(game_state, rng)
             else:
                  increment_bar(game_state, "QuestBar", div_floor(completed_task_duration, 1000))
 
         # Plot Progression
         if is_bar_done(game_state, "PlotBar"):
-            interplot_cinematic(game_state)
+            interplot_cinematic(game_state, rng)
         else:
             increment_bar(game_state, "PlotBar", div_floor(completed_task_duration, 1000))
 
 
     # --- Dequeue Next Task ---
-    while is_bar_done(game_state, "TaskBar"): # Process queue until a task takes time
+    while task_bar.done(): # Process queue until a task takes time
         next_task_str = dequeue_task(game_state)
 
         if next_task_str:
@@ -1329,74 +1932,159 @@ def process_tick(game_state, elapsed_msec):
             description = parts[2] if len(parts) > 2 else "Doing something..."
 
             if task_type == 'plot':
-                complete_act(game_state)
+                complete_act(game_state, rng)
                 # Description is usually "Loading", set by complete_act->interplot or directly
-                set_current_task(game_state, game_state["bestplot"], duration, "plot_loading")
+                set_current_task(game_state, game_state.bestplot, duration, "plot_loading")
             elif task_type == 'task':
                 set_current_task(game_state, description, duration, "queued_task")
             else:
                 print(f"Warning: Unknown task type in queue: {task_type}")
                 set_current_task(game_state, "Thinking...", 500, "unknown_task") # Placeholder
 
-        # If queue empty, decide next action
-        elif is_bar_done(game_state, "EncumBar"):
-            set_current_task(game_state, "Heading to market to sell loot", 4000, "market")
-        elif game_state.get("task") in ['market', 'sell']: # Check if currently selling
-            inventory = game_state.get("Inventory", [])
-            item_to_sell = None
-            sell_index = -1
+        # If queue empty, decide next action (selling comes first: the pack stays full until it's done)
+        elif finished_task in ['market', 'sell']: # Arrived at market, or sold an item
             # Find first non-Gold item to sell
-            for i, (name, qty) in enumerate(inventory):
-                 if name != "Gold":
-                      item_to_sell = name
-                      sell_index = i
-                      break
+            row = get_inventory(game_state).first_non_gold()
 
-            if item_to_sell:
+            if row:
+                item_to_sell, sell_qty = row
                 # Calculate sale price
                 level = get_trait_i(game_state, 'Level')
                 base_price = level # Base price per item = level
                 if ' of ' in item_to_sell: # Magic item bonus
-                    base_price *= (1 + RandomLow(10)) * (1 + RandomLow(level))
-                amt = inventory[sell_index][1] * base_price
+                    base_price *= (1 + rng.random_low(10)) * (1 + rng.random_low(level))
+                amt = sell_qty * base_price
 
                 # Set selling task
-                sell_desc = f"Selling {indefinite(item_to_sell, inventory[sell_index][1])}"
+                sell_desc = f"Selling {indefinite(item_to_sell, sell_qty)}"
                 set_current_task(game_state, sell_desc, 1000, "sell") # 1 sec to sell
 
                 # Perform sale transaction *now* before the task starts visually
                 # (Original JS did it after task completion)
-                add_inventory(game_state, item_to_sell, -inventory[sell_index][1]) # Remove sold item
+                add_inventory(game_state, item_to_sell, -sell_qty) # Remove sold item
                 add_inventory(game_state, 'Gold', amt) # Add gold
 
             else: # Nothing left to sell
-                 game_state["task"] = "" # Clear market/sell status
                  set_current_task(game_state, "Heading to the killing fields", 4000, "heading")
 
+        elif is_bar_done(game_state, "EncumBar"):
+            set_current_task(game_state, "Heading to market to sell loot", 4000, "market")
+
         # Buy equipment if affordable and not just finished selling/heading
         elif (get_inventory_item_qty(game_state, 'Gold') > (5 * get_trait_i(game_state, 'Level')**2 + 10 * get_trait_i(game_state, 'Level') + 20)) and \
-             game_state.get("task") not in ['heading', 'market', 'sell']:
+             finished_task not in ['heading', 'market', 'sell']:
              set_current_task(game_state, "Negotiating purchase of better equipment", 5000, "buying")
 
         # Default: Go killing
         else:
-             monster_task(game_state) # This sets the task description and duration
+             monster_task(game_state, rng) # This sets the task description and duration
 
         # Make sure taskbar isn't already done if duration was 0
-        if game_state.get("TaskBar", {}).get("max", 0) == 0:
-             set_bar_position(game_state, "TaskBar", 1) # Ensure it's not done immediately
+        if task_bar.max == 0:
+             task_bar.set_position(1) # Ensure it's not done immediately
+
+
+def simulate(game_state, seconds, tick_msec=None):
+    """Advance the game by `seconds` of game time, one task completion at a time.
+
+    Instead of nudging the TaskBar every few milliseconds this jumps straight
+    to the end of the current task and lets process_tick handle the completion.
+    All randomness is drawn at task completion, so the sequence of events is the
+    same as tick-by-tick stepping. Pass `tick_msec` to consume time in whole
+    ticks, exactly like a fixed-interval timer calling process_tick would
+    (overshoot at the end of a task is lost, as it is with the timer).
+    Returns the number of tasks completed.
+    """
+    budget = round(seconds * 1000, 3) # msec (rounded so whole ticks given in seconds stay whole)
+    tasks_before = game_state.tasks
+    rng = get_rng(game_state)
+
+    task_bar = game_state.TaskBar
+    while True:
+        remaining = task_bar.max - task_bar.position
+        if tick_msec:
+            step = max(1, math.ceil(remaining / tick_msec)) * tick_msec
+        else:
+            step = max(0, remaining)
+        if step > budget: break
+        process_tick(game_state, step, rng)
+        budget -= step
+
+    # Leftover time goes into the current task
+    if tick_msec: budget -= budget % tick_msec
+    if budget > 0:
+        task_bar.increment(budget)
+
+    return game_state.tasks - tasks_before
+
+
+# --- Offline Catch-up ---
+
+CATCH_UP_CHUNK_SEC = 3600 # Game time simulated between progress callbacks
+
+def offline_seconds(game_state, now=None):
+    """Wall-clock seconds since the state was last saved (0 if unknown)."""
+    stamp = game_state.stamp or 0
+    if not stamp: return 0
+    if now is None: now = time.time()
+    return max(0, now - stamp)
+
+def progress_summary(game_state):
+    """Snapshot of the counters used to describe what happened during catch-up."""
+    return {
+        "level": get_trait_i(game_state, 'Level'),
+        "act": game_state.act,
+        "tasks": game_state.tasks,
+        "gold": get_inventory_item_qty(game_state, 'Gold'),
+        "items": len(game_state.Inventory) - 1, # Gold row excluded
+        "spells": len(game_state.Spells),
+        "quest": game_state.bestquest,
+    }
+
+def describe_progress(before, after, seconds):
+    """Return human-readable lines comparing two progress_summary snapshots."""
+    lines = [f"While you were away ({rough_time(seconds)}):"]
+    lines.append(f"Completed {after['tasks'] - before['tasks']} tasks")
+    if after["level"] != before["level"]:
+        lines.append(f"Gained {after['level'] - before['level']} levels (now Level {after['level']})")
+    if after["act"] != before["act"]:
+        lines.append(f"Advanced to Act {to_roman(after['act'])}")
+    if after["spells"] != before["spells"]:
+        lines.append(f"Learned {after['spells'] - before['spells']} new spells")
+    gold = after["gold"] - before["gold"]
+    lines.append(f"{'Earned' if gold >= 0 else 'Spent'} {abs(gold)} gold (now {after['gold']})")
+    lines.append(f"Carrying {after['items']} kinds of items")
+    if after["quest"]:
+        lines.append(f"Current quest: {after['quest']}")
+    return lines
+
+def catch_up(game_state, seconds, progress=None, chunk_seconds=CATCH_UP_CHUNK_SEC):
+    """Fast-forward `seconds` of offline time in chunks.
+
+    `progress(done_seconds, total_seconds)` is called after every chunk; if it
+    returns False the catch-up stops early. Returns the seconds simulated.
+    """
+    done = 0
+    while done < seconds:
+        chunk = min(chunk_seconds, seconds - done)
+        simulate(game_state, chunk)
+        done += chunk
+        if progress is not None and progress(done, seconds) is False:
+            break
+    return done
 
 
 # --- Character Creation ---
 
-def roll_stats():
+def roll_stats(rng=None):
     """Roll 6 primary stats (3d6 each) and calculate HP/MP."""
-    stats = {"seed": get_random_state()} # Store seed used for these rolls
+    rng = rng or _alea
+    stats = {"seed": rng.get_state()} # Store seed used for these rolls
     total = 0
     best_val = -1
     best_stat_name = ""
     for stat_name in PRIME_STATS:
-        roll = 3 + Random(6) + Random(6) + Random(6)
+        roll = 3 + rng.random_int(6) + rng.random_int(6) + rng.random_int(6)
         stats[stat_name] = roll
         total += roll
         if roll > best_val:
@@ -1404,43 +2092,47 @@ def roll_stats():
             best_stat_name = stat_name
 
     stats["best"] = best_stat_name # Store best stat *at creation*
-    stats['HP Max'] = Random(8) + div_floor(stats.get('CON', 0), 6)
-    stats['MP Max'] = Random(8) + div_floor(stats.get('INT', 0), 6)
+    stats['HP Max'] = rng.random_int(8) + div_floor(stats.get('CON', 0), 6)
+    stats['MP Max'] = rng.random_int(8) + div_floor(stats.get('INT', 0), 6)
     stats["total"] = total # Store total roll for display/color coding if needed
     return stats
 
-def create_new_character(name, race_name, class_name, stats_dict):
-    """Creates a new game state dictionary for a starting character."""
-    game_state = copy.deepcopy(DEFAULT_SAVE_SCHEMA) # Start with schema
+def create_new_character(name, race_name, class_name, stats_dict, rng=None):
+    """Creates a new GameState for a starting character.
+
+    The character gets its own PRNG stream continuing from `rng` (default: the
+    module-wide stream the stats were rolled with).
+    """
+    game_state = GameState() # Start with schema defaults
 
     # Basic Info
-    game_state["Traits"]["Name"] = name
-    game_state["Traits"]["Race"] = race_name
-    game_state["Traits"]["Class"] = class_name
-    game_state["Traits"]["Level"] = 1
-    game_state["birthday"] = time.strftime("%Y-%m-%d %H:%M:%S")
-    game_state["birthstamp"] = time.time()
-    game_state["date"] = game_state["birthday"]
-    game_state["stamp"] = game_state["birthstamp"]
-    game_state["saveName"] = name
+    game_state.Traits["Name"] = name
+    game_state.Traits["Race"] = race_name
+    game_state.Traits["Class"] = class_name
+    game_state.Traits["Level"] = 1
+    game_state.birthday = time.strftime("%Y-%m-%d %H:%M:%S")
+    game_state.birthstamp = time.time()
+    game_state.date = game_state.birthday
+    game_state.stamp = game_state.birthstamp
+    game_state.saveName = name
 
     # Stats
-    game_state["Stats"] = stats_dict # Use the rolled stats
-    game_state["dna"] = stats_dict["seed"] # Use the seed from stat rolling as DNA
-    game_state["seed"] = get_random_state() # Set current PRNG state
+    game_state.Stats = stats_dict # Use the rolled stats
+    game_state.dna = stats_dict["seed"] # Use the seed from stat rolling as DNA
+    game_state.rng = AleaRandom((rng or _alea).get_state()) # Character's own stream
+    game_state.seed = game_state.rng.get_state() # Set current PRNG state
 
     # Initial Equipment
-    game_state["Equips"]["Weapon"] = "Sharp Rock"
-    game_state["Equips"]["Hauberk"] = "-3 Burlap" # Default starting armor
-    game_state["bestequip"] = "Sharp Rock" # Initial best
+    game_state.Equips["Weapon"] = "Sharp Rock"
+    game_state.Equips["Hauberk"] = "-3 Burlap" # Default starting armor
+    game_state.bestequip = "Sharp Rock" # Initial best
 
     # Initial State
-    game_state["act"] = 0
-    game_state["bestplot"] = "Prologue"
-    game_state["kill"] = "Loading...."
-    game_state["Inventory"] = [['Gold', 0]] # Ensure starting gold is 0
-    game_state["Spells"] = []
-    game_state["Quests"] = []
+    game_state.act = 0
+    game_state.bestplot = "Prologue"
+    game_state.kill = "Loading...."
+    game_state.Inventory = Inventory([['Gold', 0]]) # Ensure starting gold is 0
+    game_state.log = make_event_log(game_state) # Spill file is named after the character
 
     # Initial Bar Values
     update_bar_max(game_state, "ExpBar", level_up_time(1))
@@ -1456,7 +2148,7 @@ def create_new_character(name, race_name, class_name, stats_dict):
     set_bar_position(game_state, "TaskBar", 0)
 
     # Initial Task Queue (Prologue)
-    game_state["queue"] = [
+    game_state.queue = [
       'task|10|Experiencing an enigmatic and foreboding night vision',
       "task|6|Much is revealed about that wise old bastard you'd underestimated",
       'task|6|A shocking series of events leaves you alone and bewildered, but resolute',
@@ -1465,14 +2157,18 @@ def create_new_character(name, race_name, class_name, stats_dict):
     ]
 
     # Calculate initial best stat/spell strings
-    game_state["beststat"] = find_best_stat_string(game_state)
-    game_state["bestspell"] = find_best_spell_string(game_state) # Will be empty
+    game_state.beststat = find_best_stat_string(game_state)
+    game_state.bestspell = find_best_spell_string(game_state) # Will be empty
 
     return game_state
 
 
 # --- Save/Load ---
 
+def to_pqw_dict(game_state):
+    """Return the game state as the plain dict the .pqw format expects."""
+    return game_state.to_pqw_dict()
+
 def b64_encode(data):
     """Encode dictionary to base64 string."""
     json_str = json.dumps(data, separators=(',', ':')) # Compact JSON
@@ -1490,91 +2186,1053 @@ def b64_decode(b64_str):
         print(f"Error decoding save data: {e}")
         return None
 
-def save_game(game_state, filename=None):
-    """Saves the game state to a .pqw file (base64 encoded JSON)."""
-    if not game_state or "Traits" not in game_state:
-        print("Invalid game state, cannot save.")
+# --- Binary Save Format (.pqb) ---
+
+# Same dict as a .pqw, but as tagged binary values with every string stored
+# once in a table (item names, monster names and log messages repeat a lot),
+# zlib-compressed. Layout: BINARY_MAGIC, version byte, zlib(string table + value).
+BINARY_MAGIC = b"\x89PQB" # The 0x89 byte can't start a base64 .pqw
+BINARY_VERSION = 1
+SAVE_EXTENSIONS = (".pqw", ".pqb")
+SAVE_FORMAT = ".pqw" # Extension new saves get; .pqw stays compatible with the web version
+STORAGE_BACKEND = "files" # "files": one file per character; "sqlite": all in SQLITE_FILENAME
+SQLITE_FILENAME = "characters.db"
+
+_T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_LIST, _T_DICT = range(8)
+_DOUBLE = struct.Struct('<d')
+
+def _put_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _bin_value(value, out, strings):
+    t = type(value)
+    if t is str:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        out.append(_T_STR)
+        _put_varint(out, index)
+    elif t is int:
+        out.append(_T_INT)
+        _put_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1)) # Zigzag
+    elif t is float:
+        out.append(_T_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif t is bool:
+        out.append(_T_TRUE if value else _T_FALSE)
+    elif value is None:
+        out.append(_T_NONE)
+    elif isinstance(value, dict):
+        out.append(_T_DICT)
+        _put_varint(out, len(value))
+        for key, item in value.items(): # Keys keep their type (log stamps stay floats)
+            _bin_value(key, out, strings)
+            _bin_value(item, out, strings)
+    elif isinstance(value, (list, tuple)):
+        out.append(_T_LIST)
+        _put_varint(out, len(value))
+        for item in value:
+            _bin_value(item, out, strings)
+    elif isinstance(value, int): # int subclasses
+        _bin_value(int(value), out, strings)
+    else:
+        raise TypeError(f"Can't save values of type {t.__name__}")
+
+def bin_encode(data):
+    """Encode a .pqw dict in the binary .pqb format."""
+    strings = {}
+    body = bytearray()
+    _bin_value(data, body, strings)
+    table = bytearray()
+    _put_varint(table, len(strings))
+    for text in strings: # Insertion order = index order
+        raw = text.encode('utf-8')
+        _put_varint(table, len(raw))
+        table += raw
+    return BINARY_MAGIC + bytes([BINARY_VERSION]) + zlib.compress(bytes(table + body))
+
+class _BinReader:
+    __slots__ = ("buf", "pos", "strings")
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+        self.strings = []
+
+    def varint(self):
+        buf, pos = self.buf, self.pos
+        b = buf[pos]
+        pos += 1
+        n = b & 0x7f
+        shift = 7
+        while b & 0x80:
+            b = buf[pos]
+            pos += 1
+            n |= (b & 0x7f) << shift
+            shift += 7
+        self.pos = pos
+        return n
+
+    def value(self):
+        tag = self.buf[self.pos]
+        self.pos += 1
+        if tag == _T_STR: return self.strings[self.varint()]
+        if tag == _T_INT:
+            n = self.varint()
+            return -((n + 1) >> 1) if n & 1 else n >> 1
+        if tag == _T_FLOAT:
+            value = _DOUBLE.unpack_from(self.buf, self.pos)[0]
+            self.pos += 8
+            return value
+        if tag == _T_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _T_DICT:
+            result = {}
+            for _ in range(self.varint()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == _T_NONE: return None
+        if tag == _T_FALSE: return False
+        if tag == _T_TRUE: return True
+        raise ValueError(f"Bad value tag {tag} at offset {self.pos - 1}")
+
+def bin_decode(raw):
+    """Decode a .pqb file's bytes back to a dictionary (None if invalid)."""
+    try:
+        if raw[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError("not a .pqb file")
+        version = raw[len(BINARY_MAGIC)]
+        if version > BINARY_VERSION:
+            raise ValueError(f"format version {version} is newer than this game ({BINARY_VERSION})")
+        reader = _BinReader(zlib.decompress(raw[len(BINARY_MAGIC) + 1:]))
+        for _ in range(reader.varint()):
+            size = reader.varint()
+            reader.strings.append(reader.buf[reader.pos:reader.pos + size].decode('utf-8'))
+            reader.pos += size
+        return reader.value()
+    except (ValueError, IndexError, struct.error, zlib.error, UnicodeDecodeError) as e:
+        print(f"Error decoding save data: {e}")
+        return None
+
+def encode_save(data, filename):
+    """File contents for a save dict, in the format the filename's extension asks for."""
+    if Path(filename).suffix.lower() == ".pqb":
+        return bin_encode(data)
+    return b64_encode(data).encode('ascii')
+
+def decode_save(raw):
+    """Decode save file bytes of either format, told apart by the magic bytes."""
+    if raw.startswith(BINARY_MAGIC):
+        return bin_decode(raw)
+    try:
+        return b64_decode(raw.decode('ascii').strip())
+    except UnicodeDecodeError as e:
+        print(f"Error decoding save data: {e}")
+        return None
+
+def convert_save(src_path, dst_path):
+    """Convert a save file between .pqw and .pqb (by dst_path's extension); returns success."""
+    try:
+        data = decode_save(Path(src_path).read_bytes())
+        if data is None: return False
+        Path(dst_path).write_bytes(encode_save(data, dst_path))
+        return True
+    except OSError as e:
+        print(f"Error converting {src_path} to {dst_path}: {e}")
         return False
 
-    # Update timestamp and current seed before saving
-    game_state["date"] = time.strftime("%Y-%m-%d %H:%M:%S")
-    game_state["stamp"] = time.time()
-    game_state["seed"] = get_random_state() # Capture current PRNG state
+
+# --- Streaming .pqw Decoding ---
+
+LOAD_CHUNK_SIZE = 1 << 20 # base64 characters read at a time
+
+_JSON_WS = b' \t\r\n'
+_JSON_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Brackets and strings; group 1 is empty for a string cut off by the end of the data
+_JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*("?)|[{}\[\]]')
+_JSON_SCALAR_END = re.compile(rb'[,}\]\s]')
+
+class PqwStream:
+    """Reads a .pqw file's top-level fields one at a time.
+
+    The base64 text is decoded LOAD_CHUNK_SIZE characters at a time, and each
+    top-level value is only parsed (json.loads on its own bytes) once the end
+    of it has been found, so no full-size string or byte copies of the file
+    are ever made. Skipped values, e.g. a huge `log`, are scanned over and
+    dropped without being kept in memory.
+    """
+
+    def __init__(self, f, chunk_size=LOAD_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = bytearray() # Decoded JSON not consumed yet
+        self.pos = 0
+        self.tail = b"" # Base64 characters short of a 4-character group
+
+    def _more(self):
+        """Decode another chunk into buf; False at the end of the file."""
+        raw = self.f.read(self.chunk_size)
+        if not raw:
+            if self.tail: raise ValueError("truncated base64 data")
+            return False
+        raw = self.tail + raw.translate(None, _JSON_WS)
+        cut = len(raw) - len(raw) % 4
+        self.tail = raw[cut:]
+        self.buf += base64.b64decode(raw[:cut], validate=True)
+        return True
+
+    def _need_more(self):
+        if not self._more(): raise ValueError("unexpected end of save data")
+
+    def _peek(self):
+        """Next non-whitespace byte (not consumed)."""
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in _JSON_WS:
+                self.pos += 1
+            if self.pos < len(buf): return buf[self.pos]
+            self._need_more()
+
+    def _value_end(self, discard=False):
+        """Offset just past the JSON value at pos. With `discard`, bytes
+        already scanned are dropped from buf as it goes (pos is then invalid)."""
+        c = self._peek()
+        if c == 0x22: # '"'
+            while True:
+                m = _JSON_STRING.match(self.buf, self.pos)
+                if m: return m.end()
+                self._need_more()
+        if c not in b'{[':
+            while True:
+                m = _JSON_SCALAR_END.search(self.buf, self.pos)
+                if m: return m.start()
+                self._need_more()
+        depth = 0
+        scan = self.pos
+        while True:
+            buf = self.buf
+            for m in _JSON_TOKEN.finditer(buf, scan):
+                quote = m.group(1)
+                if quote is None: # Bracket
+                    depth += 1 if buf[m.start()] in b'{[' else -1
+                    if depth == 0: return m.end()
+                elif not quote: # String cut off, read more and rescan it
+                    scan = m.start()
+                    break
+            else:
+                scan = len(buf)
+            if discard: # Nothing before scan is needed any more
+                del buf[:scan]
+                self.pos = scan = 0
+            self._need_more()
+
+    def items(self, skip=(), only=None):
+        """Yield (key, value) for each top-level field, leaving out the `skip`
+        keys (and, if given, any key not in `only`). With `only`, reading stops
+        as soon as all of those keys have been seen."""
+        if self._peek() != 0x7b: raise ValueError("save data is not a JSON object") # '{'
+        self.pos += 1
+        wanted = None if only is None else set(only) - set(skip)
+        while wanted is None or wanted:
+            c = self._peek()
+            if c == 0x7d: return # '}'
+            if c == 0x2c: # ','
+                self.pos += 1
+                continue
+            end = self._value_end()
+            key = json.loads(self.buf[self.pos:end])
+            self.pos = end
+            if self._peek() != 0x3a: raise ValueError(f"expected ':' after {key!r}") # ':'
+            self.pos += 1
+            if key in skip or (only is not None and key not in only):
+                self.pos = self._value_end(discard=True)
+            else:
+                end = self._value_end()
+                value = json.loads(self.buf[self.pos:end])
+                self.pos = end
+                if wanted is not None: wanted.discard(key)
+                yield key, value
+            del self.buf[:self.pos] # Keep only unparsed data around
+            self.pos = 0
+
+def stream_pqw(path, skip=(), chunk_size=LOAD_CHUNK_SIZE):
+    """Decode a .pqw file into a dict without the `skip` fields (None if invalid)."""
+    try:
+        with open(path, 'rb') as f:
+            return dict(PqwStream(f, chunk_size).items(skip))
+    except (OSError, ValueError, base64.binascii.Error) as e: # JSONDecodeError is a ValueError
+        print(f"Error decoding save data: {e}")
+        return None
+
+def read_pqw_log(path, chunk_size=LOAD_CHUNK_SIZE):
+    """Just the `log` dict of a save file ({} if it has none or can't be read)."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC: # .pqb: no partial decoding
+                data = bin_decode(BINARY_MAGIC + f.read())
+                return (data or {}).get("log", {})
+            f.seek(0)
+            for _, log in PqwStream(f, chunk_size).items(only=("log",)):
+                return log
+    except (OSError, ValueError, base64.binascii.Error) as e:
+        print(f"Error reading the log of {path}: {e}")
+    return {}
+
+
+def save_exists(filename):
+    """Whether a save of this name exists in the current storage backend."""
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().exists(filename)
+    return (SAVE_DIR / filename).is_file()
+
+def save_filename(game_state):
+    """Save filename for a character: its existing save, else Name + SAVE_FORMAT."""
+    name = game_state.Traits.get('Name', 'UnnamedCharacter')
+    for extension in (SAVE_FORMAT,) + SAVE_EXTENSIONS: # A character keeps its format
+        if save_exists(f"{name}{extension}"):
+            return f"{name}{extension}"
+    return f"{name}{SAVE_FORMAT}"
+
+def prepare_save(game_state):
+    """Stamp the state for saving: save time, PRNG state and best-of strings."""
+    game_state.date = time.strftime("%Y-%m-%d %H:%M:%S")
+    game_state.stamp = time.time()
+    game_state.seed = get_rng(game_state).get_state() # Capture current PRNG state
+
+    log = game_state.log
+    if log.store is None: # An embedded log must not be saved without its history
+        log.load_older() # Usually read in the background already
+    log.flush() # Persist evicted (or, with a log store, new) entries
+    if log.store is not None:
+        game_state.logStore = log.store.pointer()
 
     # Recalculate bests before saving (like JS HotOrNot)
-    game_state["beststat"] = find_best_stat_string(game_state)
-    game_state["bestspell"] = find_best_spell_string(game_state)
+    game_state.beststat = find_best_stat_string(game_state)
+    game_state.bestspell = find_best_spell_string(game_state)
     # bestequip is updated dynamically
 
-    if filename is None:
-        char_name = game_state.get("Traits", {}).get("Name", "UnnamedCharacter")
-        filename = f"{char_name}.pqw"
-
+def snapshot_pqw_dict(game_state):
+    """to_pqw_dict() copy that shares no mutable containers with the live state.
+
+    Cheap (shallow copies of each field, one level deeper for lists of rows),
+    so the GUI thread can take it and hand it to a writer thread while the
+    game keeps running.
+    """
+    data = game_state.to_pqw_dict()
+    for key, value in data.items():
+        if isinstance(value, dict):
+            data[key] = dict(value)
+        elif isinstance(value, list):
+            data[key] = [list(v) if isinstance(v, list) else v for v in value]
+    return data
+
+def write_save(data, filename):
+    """Atomically write a .pqw dict to SAVE_DIR/filename (.pqw or .pqb format).
+
+    The file is written to a temp file in the same directory, fsynced and
+    then renamed over the old save, so a crash mid-write leaves the previous
+    save intact. Safe to call from a worker thread, but not concurrently for
+    the same filename. With the SQLite backend the save is a row instead.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().put(filename, data)
     filepath = SAVE_DIR / filename
+    tmp_path = None
     try:
-        b64_data = b64_encode(game_state)
-        with open(filepath, 'w') as f:
-            f.write(b64_data)
-        # _log_event(game_state, f"Game saved: {filename}") # Log after successful save
+        contents = encode_save(data, filename)
+        tmp_path = SAVE_DIR / f".{filename}.tmp" # Hidden, and not matched by *.pqw
+        with open(tmp_path, 'wb') as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        if SNAPSHOT_KEEP: add_snapshot(filename, contents, data.get("stamp"))
+        os.replace(tmp_path, filepath)
+        tmp_path = None
+        _fsync_dir(SAVE_DIR) # Make the rename itself durable
         print(f"Game saved to {filepath}")
         return True
     except Exception as e:
         print(f"Error saving game to {filepath}: {e}")
-        # _log_event(game_state, f"Save FAILED: {e}")
         return False
+    finally:
+        if tmp_path is not None:
+            try: os.remove(tmp_path)
+            except OSError: pass
 
+def _fsync_dir(path):
+    if not hasattr(os, 'O_DIRECTORY'): return # Not available (or needed) on Windows
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try: os.fsync(fd)
+        finally: os.close(fd)
+    except OSError:
+        pass
 
-def load_game(filename):
-    """Loads a game state from a .pqw file."""
-    filepath = SAVE_DIR / filename
-    if not filepath.is_file():
-        print(f"Save file not found: {filepath}")
-        return None
+def save_game(game_state, filename=None):
+    """Saves the game state to a .pqw (base64 encoded JSON) or .pqb file, atomically.
 
+    This is a full snapshot: the character's journal is compacted away.
+    """
+    if not isinstance(game_state, GameState):
+        print("Invalid game state, cannot save.")
+        return False
+
+    prepare_save(game_state)
+    clear_changes(game_state)
+    return write_checkpoint(to_pqw_dict(game_state), filename or save_filename(game_state))
+
+
+# --- Snapshot Rotation ---
+
+# Every full save is also kept as a snapshot in SAVE_DIR/.snapshots/<filename>/,
+# a separate copy written on a background thread. manifest.json there records
+# each snapshot's sha256, size, stamp and day, plus the checksum of the current
+# save file (and of the one it replaced, in case a crash stopped the rename).
+# Loads fall back to the newest snapshot that decodes when the save doesn't; a
+# save that decodes but doesn't match its checksum was replaced outside the game
+# (a converted or copied-in file) and is loaded, and its checksum recorded. Pruning keeps the last SNAPSHOT_KEEP snapshots and the first one
+# of each of the last SNAPSHOT_DAYS days, on the same background thread.
+SNAPSHOT_DIRNAME = ".snapshots"
+SNAPSHOT_KEEP = 10 # Most recent snapshots kept; 0 = no snapshots
+SNAPSHOT_DAYS = 7 # Days for which the day's first snapshot is kept
+SNAPSHOT_MANIFEST = "manifest.json"
+_snapshot_lock = threading.Lock() # Saves and pruning update manifests from different threads
+_housekeeping = None # Single background thread for pruning
+
+def snapshot_dir(filename):
+    """Snapshot directory of a save filename."""
+    return SAVE_DIR / SNAPSHOT_DIRNAME / filename
+
+def _read_manifest(directory):
     try:
-        # Use a separate try block just for file reading to ensure proper closure
-        b64_data = None
+        with open(directory / SNAPSHOT_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("snapshots"), dict): return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"current": None, "snapshots": {}} # Snapshots without a record are still tried
+
+def _write_manifest(directory, manifest):
+    """Durably replace a manifest: it must not lag behind the save it describes."""
+    tmp_path = directory / f".{SNAPSHOT_MANIFEST}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, directory / SNAPSHOT_MANIFEST)
+
+def file_checksum(path):
+    """sha256 hex digest of a file, read a chunk at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(LOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def add_snapshot(filename, contents, stamp=None):
+    """Record `contents` as the about-to-be-saved file of `filename` and queue
+    a snapshot copy of it.
+
+    Called before the new file replaces the save: the manifest names the new
+    checksum and keeps the old one, so either file verifies if a crash stops
+    the rename. The snapshot itself is written and the old ones pruned on the
+    housekeeping thread. Problems are reported, not raised: the save itself
+    matters more.
+    """
+    directory = snapshot_dir(filename)
+    stamp = stamp or time.time()
+    stem, extension = os.path.splitext(filename)
+    name = f"{stem}.{time.strftime('%Y%m%d-%H%M%S', time.localtime(stamp))}.{int(stamp * 1000) % 1000:03d}{extension}"
+    record = {"sha256": hashlib.sha256(contents).hexdigest(), "size": len(contents),
+              "stamp": stamp, "day": time.strftime("%Y-%m-%d", time.localtime(stamp))}
+    try:
+        with _snapshot_lock:
+            directory.mkdir(parents=True, exist_ok=True)
+            manifest = _read_manifest(directory)
+            previous = manifest.get("current") or {}
+            manifest["current"] = {"sha256": record["sha256"], "size": record["size"],
+                                   "previous": previous.get("sha256")}
+            _write_manifest(directory, manifest)
+    except OSError as e:
+        print(f"Error recording the checksum of {filename}: {e}")
+        return
+    global _housekeeping
+    if _housekeeping is None:
+        _housekeeping = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pq-housekeeping")
+    _housekeeping.submit(_write_snapshot, filename, name, contents, record)
+
+def _write_snapshot(filename, name, contents, record):
+    """Write one snapshot file and its manifest record, then prune (housekeeping thread)."""
+    directory = snapshot_dir(filename)
+    tmp_path = directory / f".{name}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, directory / name)
+        with _snapshot_lock:
+            manifest = _read_manifest(directory)
+            manifest["snapshots"][name] = record
+            _write_manifest(directory, manifest)
+    except OSError as e:
+        print(f"Error keeping a snapshot of {filename}: {e}")
+        try: tmp_path.unlink()
+        except OSError: pass
+        return
+    prune_snapshots(filename)
+
+def wait_for_housekeeping():
+    """Block until queued snapshot writes and pruning have finished."""
+    if _housekeeping is not None:
+        _housekeeping.submit(lambda: None).result()
+
+def prune_snapshots(filename):
+    """Delete the snapshots of a save that rotation no longer keeps."""
+    directory = snapshot_dir(filename)
+    with _snapshot_lock:
+        manifest = _read_manifest(directory)
+        snapshots = manifest["snapshots"]
+        newest_first = sorted(snapshots, key=lambda n: snapshots[n]["stamp"], reverse=True)
+        keep = set(newest_first[:SNAPSHOT_KEEP])
+        days = {}
+        for name in reversed(newest_first): # Oldest first: the day's first snapshot wins
+            days.setdefault(snapshots[name]["day"], name)
+        for day in sorted(days, reverse=True)[:SNAPSHOT_DAYS]:
+            keep.add(days[day])
+        try:
+            on_disk = [p for p in directory.iterdir() if p.name != SNAPSHOT_MANIFEST and not p.name.startswith('.')]
+        except OSError:
+            return
+        for path in on_disk:
+            if path.name not in keep: # Unrecorded leftovers go too
+                try: path.unlink()
+                except OSError as e: print(f"Error pruning snapshot {path}: {e}")
+        manifest["snapshots"] = {name: snapshots[name] for name in newest_first if name in keep}
         try:
-            with open(filepath, 'r') as f:
-                b64_data = f.read()
-        except Exception as file_error:
-            print(f"Error reading file {filepath}: {file_error}")
+            _write_manifest(directory, manifest)
+        except OSError as e:
+            print(f"Error writing snapshot manifest in {directory}: {e}")
+
+def record_save_checksum(filename, checksum, size):
+    """Accept a save file that was replaced outside the game as its current one."""
+    directory = snapshot_dir(filename)
+    try:
+        with _snapshot_lock:
+            manifest = _read_manifest(directory)
+            manifest["current"] = {"sha256": checksum, "size": size, "previous": None}
+            _write_manifest(directory, manifest)
+    except OSError as e:
+        print(f"Error recording the checksum of {filename}: {e}")
+
+def save_candidates(filename):
+    """(path, recorded sha256 checksums or None) to try loading a save from:
+    the save file first, then its snapshots, newest first."""
+    directory = snapshot_dir(filename)
+    with _snapshot_lock:
+        manifest = _read_manifest(directory)
+    current = manifest.get("current") or {}
+    accepted = tuple(sha for sha in (current.get("sha256"), current.get("previous")) if sha)
+    candidates = [(SAVE_DIR / filename, accepted or None)]
+    snapshots = manifest["snapshots"]
+    try:
+        unrecorded = [p.name for p in directory.iterdir()
+                      if p.suffix in SAVE_EXTENSIONS and p.name not in snapshots]
+    except OSError:
+        unrecorded = []
+    names = sorted(snapshots, key=lambda n: snapshots[n]["stamp"], reverse=True)
+    names += sorted(unrecorded, reverse=True) # Timestamped names sort by age
+    for name in names:
+        sha = snapshots.get(name, {}).get("sha256")
+        candidates.append((directory / name, (sha,) if sha else None))
+    return candidates
+
+
+# --- Save Journal ---
+
+# Between full snapshots, changes are appended to SAVE_DIR/<Name>.pqw.pqj, one
+# JSON record per line. The first line names the snapshot the records apply to
+# ({"base": stamp}); every other line is a delta holding the small scalar fields
+# and bars, plus only the sections that changed since the previous record.
+# With the SQLite backend the same records are rows of the database's journal
+# table instead, so a save and its journal never get out of step.
+JOURNAL_SECTIONS = ("Traits", "Stats", "Equips", "Spells", "Quests") # Tracked in game_state.changed
+_JOURNAL_SKIP = frozenset(JOURNAL_SECTIONS) | frozenset(BAR_KEYS) | {"Inventory", "log"}
+JOURNAL_CORE_KEYS = tuple(k for k in DEFAULT_SAVE_SCHEMA if k not in _JOURNAL_SKIP)
+
+def journal_path(filename):
+    """Journal file that goes with a save filename (Name.pqw -> Name.pqw.pqj)."""
+    return SAVE_DIR / f"{filename}.pqj"
+
+def clear_changes(game_state):
+    """Forget tracked changes (after taking a full snapshot)."""
+    game_state.changed.clear()
+    game_state.Inventory.take_changes()
+    game_state.log.take_new()
+
+def take_delta(game_state):
+    """Stamp the state and return a journal record of what changed since the last one.
+
+    Costs O(changes): the core fields and bars are a few dozen values, and
+    inventory, log and the other sections are only included when they changed.
+    """
+    prepare_save(game_state)
+    record = {"core": {key: copy.copy(getattr(game_state, key)) for key in JOURNAL_CORE_KEYS},
+              "bars": {}}
+    for key in BAR_KEYS:
+        bar = getattr(game_state, key)
+        record["bars"][key] = [bar.position, bar.max]
+    for section in game_state.changed:
+        value = getattr(game_state, section)
+        record[section] = value.to_list() if section == "Spells" else copy.copy(value)
+    game_state.changed.clear()
+    inventory = game_state.Inventory.take_changes()
+    if inventory: record["Inventory"] = inventory
+    log = game_state.log.take_new()
+    if log: record["log"] = log
+    return record
+
+def _write_journal_line(f, record):
+    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+def append_journal(record, filename):
+    """Durably append a take_delta record to the journal of a save; returns success."""
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().append_journal(filename, record)
+    sync_log_store(filename) # Log entries the record points to must be durable first
+    path = journal_path(filename)
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            _write_journal_line(f, record)
+        return True
+    except OSError as e:
+        print(f"Error writing journal {path}: {e}")
+        return False
+
+def reset_journal(filename, base):
+    """Atomically replace the journal with an empty one for the snapshot stamped `base`."""
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().reset_journal(filename, base)
+    path = journal_path(filename)
+    tmp_path = SAVE_DIR / f".{path.name}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            _write_journal_line(f, {"base": base})
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error resetting journal {path}: {e}")
+        try: os.remove(tmp_path)
+        except OSError: pass
+        return False
+
+def write_checkpoint(data, filename):
+    """Write a full snapshot and compact the journal (worker-thread safe).
+
+    If the snapshot can't be written, it is appended to the journal as a
+    full record instead, so the changes it covered are not lost.
+    """
+    sync_log_store(filename)
+    roster_current = STORAGE_BACKEND == "files" and roster_matches_dir()
+    if write_save(data, filename):
+        if STORAGE_BACKEND == "files": # The database compacts the journal in the save's transaction
+            reset_journal(filename, data["stamp"])
+            update_roster(filename, data, roster_current) # and is its own roster
+        return True
+    append_journal({"full": data}, filename)
+    return False
+
+def read_journal(filename, base):
+    """Journal records that apply to the snapshot stamped `base`.
+
+    Returns None if there is no journal for that snapshot. A torn last line
+    (crash mid-append) is ignored.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        lines = get_store().read_journal(filename)
+    else:
+        try:
+            with open(journal_path(filename), 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
             return None
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    if not records or records[0].get("base") != base:
+        return None # Journal belongs to another (older) snapshot
+    return records[1:]
+
+def apply_delta(game_state, record):
+    """Replay one journal record onto a loaded state."""
+    if "full" in record:
+        full = GameState.from_pqw_dict(migrate_save(record["full"]))
+        for key in GameState.__slots__:
+            setattr(game_state, key, getattr(full, key))
+        return
+    for key, value in record["core"].items():
+        setattr(game_state, key, value)
+    for key, (position, bar_max) in record["bars"].items():
+        bar = getattr(game_state, key)
+        bar.set_max(bar_max)
+        bar.set_position(position)
+    for section in JOURNAL_SECTIONS:
+        if section in record:
+            value = record[section]
+            setattr(game_state, section, Spellbook(value) if section == "Spells" else value)
+    if "Inventory" in record:
+        game_state.Inventory.apply_changes(record["Inventory"])
+    if "log" in record:
+        game_state.log.replay(record["log"])
+
+def replay_journal(game_state, filename):
+    """Bring a state loaded from a snapshot up to date; returns the records applied.
+
+    A missing or stale journal is reset, so new records can be appended to it.
+    """
+    records = read_journal(filename, game_state.stamp)
+    if records is None:
+        reset_journal(filename, game_state.stamp)
+        return 0
+    for record in records:
+        apply_delta(game_state, record)
+    return len(records)
+
+
+# --- Event Log Store ---
+
+# With LOG_STORE (files backend), the event log lives in an append-only
+# SAVE_DIR/<Name>.pqw.pql file next to the save, one JSON [stamp, message] line per
+# entry, instead of being re-encoded into every snapshot. New entries are
+# appended as the log is flushed; the save (and each journal record) only
+# holds a logStore pointer, the store's size and entry count at that point.
+# Anything past the pointer was written after the last durable save or record
+# and is cut off on load, so the log never runs ahead of the game state.
+LOG_STORE_EXTENSION = ".pql"
+
+def log_store_path(filename):
+    """Log store file that goes with a save filename (Name.pqw -> Name.pqw.pql)."""
+    return SAVE_DIR / f"{filename}{LOG_STORE_EXTENSION}"
+
+def _log_lines(entries):
+    return "".join(json.dumps([stamp, message], separators=(',', ':')) + "\n"
+                   for stamp, message in entries).encode('utf-8')
+
+class LogStore:
+    """Append-only event log file of one character, readable a page at a time.
+
+    `size` and `count` are the bytes and entries written through this
+    object; offsets passed to page() are byte offsets into the file.
+    """
+
+    def __init__(self, path, size=0, count=0):
+        self.path = Path(path)
+        self.size = size
+        self.count = count
+
+    @classmethod
+    def open(cls, path, pointer):
+        """Open a store at a save's logStore pointer, cutting off entries written
+        after it. A store that is missing or shorter than the pointer is used
+        as far as it goes."""
+        store = cls(path, pointer.get("size", 0), pointer.get("count", 0))
+        try:
+            actual = store.path.stat().st_size
+        except OSError:
+            actual = 0
+        if actual > store.size:
+            store.truncate(store.size)
+        elif actual < store.size: # Lost its tail (or was deleted): count what is left
+            print(f"Warning: event log {store.path} is shorter than its save expects")
+            store.size, store.count, end = actual, 0, 0
+            for entries, end in store.pages():
+                store.count += len(entries)
+            if actual: store.truncate(end) # Drop a torn last line
+            store.size = end
+        return store
+
+    def pointer(self):
+        """The logStore value a save records."""
+        return {"size": self.size, "count": self.count}
+
+    def append(self, entries):
+        """Append [stamp, message] entries; returns success."""
+        lines = _log_lines(entries)
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"Error writing event log {self.path}: {e}")
+            return False
+        self.size += len(lines)
+        self.count += len(entries)
+        return True
 
-        if not b64_data:
-            print(f"Empty or invalid file: {filepath}")
+    def truncate(self, size=0):
+        """Cut the file back to `size` bytes (0: empty it)."""
+        try:
+            with open(self.path, 'ab') as f:
+                f.truncate(size)
+        except OSError as e:
+            print(f"Error truncating event log {self.path}: {e}")
+        if size == 0: self.count = 0
+        self.size = size
+
+    def page(self, offset=0, limit=100):
+        """Up to `limit` entries starting at byte `offset`, and the offset after them.
+
+        Reading stops at `size`, so entries appended by another writer since
+        this store was opened are not returned.
+        """
+        entries = []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                while len(entries) < limit and offset < self.size:
+                    line = f.readline()
+                    if not line.endswith(b"\n"): break # Torn last line
+                    offset += len(line)
+                    entries.append(json.loads(line))
+        except (OSError, ValueError) as e:
+            print(f"Error reading event log {self.path}: {e}")
+        return entries, offset
+
+    def pages(self, limit=1000):
+        """Yield (entries, next offset) for the whole store, a page at a time."""
+        offset = 0
+        while True:
+            entries, offset = self.page(offset, limit)
+            if not entries: return
+            yield entries, offset
+
+    def tail(self, count=None, block=1 << 16):
+        """The last `count` entries (all of them if None), read from the end."""
+        if count is None:
+            return [entry for entries, _ in self.pages() for entry in entries]
+        if count <= 0: return []
+        data = b""
+        end = self.size
+        try:
+            with open(self.path, 'rb') as f:
+                while end > 0 and data.count(b"\n") <= count:
+                    start = max(0, end - block)
+                    f.seek(start)
+                    data = f.read(end - start) + data
+                    end = start
+        except OSError as e:
+            print(f"Error reading event log {self.path}: {e}")
+            return []
+        lines = data.split(b"\n")[:-1] # Ends with a newline
+        if end > 0: lines = lines[1:] # First one may be partial
+        return [json.loads(line) for line in lines[-count:]]
+
+def sync_log_store(filename):
+    """fsync a save's log store, before a save or journal record pointing into it."""
+    if STORAGE_BACKEND != "files" or not LOG_STORE: return
+    try:
+        with open(log_store_path(filename), 'rb+') as f:
+            os.fsync(f.fileno())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error syncing event log of {filename}: {e}")
+
+def attach_log_store(game_state, filename, lazy=False):
+    """Move a loaded character's event log into (or back from) its log store.
+
+    A save with a logStore pointer gets its last LOG_CAPACITY entries from the
+    store. A save that still embeds its log (older saves, web saves, new
+    characters) has that log written out to a fresh store once. With `lazy`,
+    neither is read here: the log's fetch_older() does it later.
+    """
+    pointer = game_state.logStore
+    path = log_store_path(filename)
+    if pointer is None:
+        log = game_state.log
+        if log.source is not None: # Lazily loaded: moves once the saved log is read
+            log.migrate_path = path
+            log._unstored = [[stamp, message] for stamp, message in log.items()] # Replayed from the journal
+            return
+        store = LogStore(path)
+        store.truncate() # Leftovers from another save of this name
+        if not store.append(list(game_state.log.items())): return # Keep it embedded
+    else:
+        store = LogStore.open(path, pointer)
+    if lazy:
+        log = make_event_log(game_state)
+        log.source = LogStore(path, store.size, store.count) # Stops at the pointer, whatever is appended
+    else:
+        log = make_event_log(game_state, dict(store.tail(LOG_CAPACITY or None)))
+    log.store = store
+    game_state.log = log
+    game_state.logStore = store.pointer()
+
+def read_log_store(filename, pointer=None):
+    """{stamp: message} of a save's log store ({} if it has none), up to a
+    logStore `pointer` if given, else all of it."""
+    path = log_store_path(filename)
+    if not path.is_file(): return {}
+    store = LogStore(path, pointer["size"] if pointer else path.stat().st_size)
+    return dict(store.tail())
+
+
+# --- Save Schema Migration ---
+
+# Migration steps, keyed by the schemaVersion they upgrade from. Each takes a
+# decoded save dict at that version and returns it at the next one.
+SAVE_MIGRATIONS = {}
+
+def migration(from_version):
+    """Register a save migration step from `from_version` to from_version + 1."""
+    def register(step):
+        SAVE_MIGRATIONS[from_version] = step
+        return step
+    return register
+
+@migration(0)
+def _migrate_unversioned(data):
+    """Web-version and pre-versioning saves: fill in the schema defaults and
+    fix encumbrance, as loading always used to."""
+    merged = copy.deepcopy(DEFAULT_SAVE_SCHEMA)
+    def recursive_update(target, source):
+        for key, value in source.items():
+            if isinstance(value, dict) and key in target and isinstance(target[key], dict):
+                recursive_update(target[key], value)
+            elif key in target: # Only update if key exists in schema
+                target[key] = value
+            # Do not add keys not present in the schema
+    recursive_update(merged, data)
+    # recursive_update only merges keys already in the (empty) schema log
+    merged["log"] = data.get("log", {})
+    # Encumbrance is recomputed from the inventory
+    cubits = sum(qty for name, qty in merged["Inventory"] if name != "Gold")
+    merged["EncumBar"]["max"] = 10 + merged["Stats"].get("STR", 0)
+    merged["EncumBar"]["position"] = cubits
+    return merged
+
+def migrate_save(data):
+    """Bring a decoded save dict up to SAVE_SCHEMA_VERSION.
+
+    A save that is already current is returned as is, without copying.
+    """
+    version = data.get("schemaVersion", 0)
+    if version == SAVE_SCHEMA_VERSION: return data # Fast path
+    if version > SAVE_SCHEMA_VERSION:
+        print(f"Warning: save schema version {version} is newer than this game ({SAVE_SCHEMA_VERSION})")
+        return data
+    while version < SAVE_SCHEMA_VERSION:
+        data = SAVE_MIGRATIONS[version](data)
+        version += 1
+        data["schemaVersion"] = version
+    return data
+
+def _read_save_file(filepath, lazy_log):
+    """Decoded save file (None if it doesn't decode, False if it can't be read)."""
+    try:
+        with open(filepath, 'rb') as f:
+            magic = f.read(len(BINARY_MAGIC))
+            if not magic:
+                print(f"Empty or invalid file: {filepath}")
+                return False
+            if magic == BINARY_MAGIC:
+                game_state = bin_decode(magic + f.read())
+                if game_state and lazy_log: game_state.pop("log", None)
+                return game_state
+            f.seek(0)
+            try:
+                return dict(PqwStream(f).items(skip=("log",) if lazy_log else ()))
+            except (ValueError, base64.binascii.Error) as e:
+                print(f"Error decoding save data: {e}")
+                return None
+    except OSError as file_error:
+        print(f"Error reading file {filepath}: {file_error}")
+        return False
+
+def _read_verified_save(filename, lazy_log):
+    """(decoded save, path it came from): the save file if it decodes, else
+    the newest snapshot that does ((None, save path) if none).
+
+    A file that decodes but doesn't match its recorded checksum is still
+    used, with a warning; for the save file the new checksum is recorded.
+    """
+    candidates = save_candidates(filename)
+    for path, expected in candidates:
+        if not path.is_file(): continue
+        game_state = _read_save_file(path, lazy_log)
+        if not game_state: continue
+        if path != candidates[0][0]: print(f"Warning: {filename} is damaged, falling back to snapshot {path.name}")
+        if expected is not None:
+            try:
+                checksum, size = file_checksum(path), path.stat().st_size
+            except OSError:
+                checksum = None
+            if checksum is not None and checksum not in expected:
+                if path == candidates[0][0]:
+                    print(f"Warning: {path} was changed outside the game; using it as the current save")
+                    record_save_checksum(filename, checksum, size)
+                else:
+                    print(f"Warning: snapshot {path} doesn't match its checksum")
+        return game_state, path
+    return None, candidates[0][0]
+
+def load_game(filename, lazy_log=False):
+    """Loads a game state from a .pqw or .pqb file (the format is detected from its contents).
+
+    .pqw files are decoded as a stream. With `lazy_log` the event log is
+    skipped; it starts empty and the saved entries are merged in later by
+    game_state.log.load_older() (done automatically before the next save).
+    A save file that fails its checksum or doesn't decode is passed over
+    for the newest good snapshot. With the SQLite backend the save is read
+    from its row, log included.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        store = get_store()
+        filepath = f"{store.path}:{filename}" # For messages
+        raw_data = store.get(filename)
+        if raw_data is None:
+            print(f"Save not found: {filepath}")
+            return None
+        lazy_log = False # The blob is decoded whole anyway
+    else:
+        filepath = SAVE_DIR / filename
+        if not filepath.is_file() and not snapshot_dir(filename).is_dir():
+            print(f"Save file not found: {filepath}")
             return None
 
-        game_state = b64_decode(b64_data)
+    try:
+        # Use a separate try block just for file reading to ensure proper closure
+        if STORAGE_BACKEND == "sqlite":
+            game_state = bin_decode(raw_data)
+        else:
+            game_state, filepath = _read_verified_save(filename, lazy_log)
 
         if game_state:
-            # Restore PRNG state
-            set_random_state(game_state.get("seed"))
             # _log_event(game_state, f"Game loaded: {filename}")
             print(f"Game loaded from {filepath}")
 
-            # Ensure essential keys exist, merging with default schema if necessary
-            # This handles loading older saves that might lack newer fields.
-            merged_state = copy.deepcopy(DEFAULT_SAVE_SCHEMA)
-            # Update recursively to preserve nested structure
-            def recursive_update(target, source):
-                for key, value in source.items():
-                    if isinstance(value, dict) and key in target and isinstance(target[key], dict):
-                        recursive_update(target[key], value)
-                    elif key in target: # Only update if key exists in schema
-                         target[key] = value
-                    # Do not add keys not present in the schema
+            # Older saves are migrated; current ones go straight to GameState
+            game_state = migrate_save(game_state)
 
-            recursive_update(merged_state, game_state)
+            # Bars, inventory, spells and log become their engine types
+            loaded = GameState.from_pqw_dict(game_state)
+            if lazy_log and loaded.logStore is None: loaded.log.source = filepath
+            replayed = replay_journal(loaded, filename) # Changes made after the snapshot
+            if replayed: print(f"Replayed {replayed} journal records for {filepath}")
+            if STORAGE_BACKEND == "files" and LOG_STORE: attach_log_store(loaded, filename, lazy_log)
 
-             # Recalculate bar hints after loading, as they are transient
-            for bar_key in ["ExpBar", "EncumBar", "PlotBar", "QuestBar", "TaskBar"]:
-                set_bar_position(merged_state, bar_key, merged_state[bar_key].get('position', 0))
+            # Give the character its own PRNG stream, continuing from the saved seed
+            loaded.rng = AleaRandom(loaded.seed)
 
-            # Ensure encumbrance is correct after load
-            update_encumbrance(merged_state)
-
-            return merged_state
+            return loaded
         else:
             print(f"Failed to decode game data from {filepath}")
             return None # Decoding failed
@@ -1584,15 +3242,23 @@ def load_game(filename):
         return None
 
 def get_saved_games():
-    """Returns a list of .pqw filenames in the savegame directory."""
-    return [f.name for f in SAVE_DIR.glob("*.pqw")]
+    """Returns a list of save filenames (.pqw and .pqb), most recently saved first."""
+    return [entry["file"] for entry in get_roster()]
 
 def delete_save_game(filename):
-    """Deletes a save game file."""
+    """Deletes a save game file (or database row)."""
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().delete(filename) # Its journal rows go with it
     filepath = SAVE_DIR / filename
+    roster_current = roster_matches_dir()
     try:
         if filepath.is_file():
             os.remove(filepath)
+            journal_path(filename).unlink(missing_ok=True)
+            log_store_path(filename).unlink(missing_ok=True)
+            wait_for_housekeeping() # A queued snapshot write would recreate the directory
+            shutil.rmtree(snapshot_dir(filename), ignore_errors=True)
+            remove_from_roster(filename, roster_current)
             print(f"Deleted save file: {filepath}")
             return True
         else:
@@ -1600,4 +3266,315 @@ def delete_save_game(filename):
             return False
     except Exception as e:
         print(f"Error deleting save file {filepath}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+# --- Roster Index ---
+
+# SAVE_DIR/.roster.json summarizes every save file (who, how far along, file
+# mtime and size) so the roster can be listed without decoding any save.
+# It is updated on every full save and delete, and trusted as long as
+# SAVE_DIR's mtime is the one seen after the last scan or update. When the
+# directory changed some other way (a file copied in, converted or removed),
+# the next query scans it: files that are new or whose mtime/size changed are
+# re-read, deleted ones dropped, and a missing or unreadable index is rebuilt.
+# The first query of each run scans too.
+ROSTER_FILENAME = ".roster.json"
+ROSTER_VERSION = 1
+_roster_lock = threading.Lock() # Saves update the roster from a worker thread
+_roster_dir_mtimes = {} # SAVE_DIR -> its mtime_ns when the roster last matched it
+
+def save_summary(data):
+    """Roster fields of a decoded save dict."""
+    traits = data.get("Traits") or {}
+    return {
+        "name": traits.get("Name", ""),
+        "race": traits.get("Race", ""),
+        "class": traits.get("Class", ""),
+        "level": str_to_int_def(traits.get("Level", 0)),
+        "act": data.get("act", 0),
+        "stamp": data.get("stamp", 0),
+    }
+
+def read_save_summary(path):
+    """save_summary of a save file, decoding only the fields it needs (None if unreadable)."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+                data = bin_decode(BINARY_MAGIC + f.read())
+            else:
+                f.seek(0)
+                data = dict(PqwStream(f).items(only=("Traits", "act", "stamp")))
+    except (OSError, ValueError, base64.binascii.Error) as e:
+        print(f"Error reading save summary of {path}: {e}")
+        return None
+    return save_summary(data) if isinstance(data, dict) else None
+
+def _read_roster():
+    try:
+        with open(SAVE_DIR / ROSTER_FILENAME, 'r', encoding='utf-8') as f:
+            roster = json.load(f)
+        if roster.get("version") == ROSTER_VERSION:
+            return roster["entries"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {} # Missing, damaged or from another version: rebuilt by the next query
+
+def _write_roster(entries):
+    path = SAVE_DIR / ROSTER_FILENAME
+    tmp_path = SAVE_DIR / f"{ROSTER_FILENAME}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": ROSTER_VERSION, "entries": entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error writing roster {path}: {e}")
+
+def _file_key(stat_result):
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+def _dir_mtime_ns():
+    try:
+        return SAVE_DIR.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def roster_matches_dir():
+    """Whether SAVE_DIR is unchanged since the roster last matched it.
+
+    Checked before a save or delete: only then can the roster be trusted
+    again once that change has been recorded in it.
+    """
+    with _roster_lock:
+        mtime_ns = _roster_dir_mtimes.get(SAVE_DIR)
+    return mtime_ns is not None and mtime_ns == _dir_mtime_ns()
+
+def _set_roster_current(current):
+    if current: _roster_dir_mtimes[SAVE_DIR] = _dir_mtime_ns()
+    else: _roster_dir_mtimes.pop(SAVE_DIR, None)
+
+def update_roster(filename, data, current=False):
+    """Record a just-written save in the roster. `current`: the roster matched
+    SAVE_DIR before the save, so it still does afterwards."""
+    try:
+        stat_result = (SAVE_DIR / filename).stat()
+    except OSError:
+        return
+    with _roster_lock:
+        entries = _read_roster()
+        entries[filename] = dict(save_summary(data), file=filename,
+                                 mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size)
+        _write_roster(entries)
+        _set_roster_current(current)
+
+def remove_from_roster(filename, current=False):
+    with _roster_lock:
+        entries = _read_roster()
+        if entries.pop(filename, None) is not None:
+            _write_roster(entries)
+        _set_roster_current(current)
+
+def get_roster():
+    """Roster entries for every save in SAVE_DIR, most recently saved first.
+
+    Each entry has file, name, race, class, level, act, stamp, mtime_ns and
+    size. The index is used as is while SAVE_DIR is unchanged; otherwise only
+    saves changed outside save_game (copied in, converted, edited) are
+    decoded, and only up to their log. With the SQLite backend this is a
+    query on the summary columns.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return get_store().roster()
+    with _roster_lock:
+        entries = _read_roster()
+        dir_mtime_ns = _dir_mtime_ns() # Before the scan: changes during it show up next time
+        if entries and dir_mtime_ns is not None and _roster_dir_mtimes.get(SAVE_DIR) == dir_mtime_ns:
+            return sorted(entries.values(), key=lambda e: e["mtime_ns"], reverse=True)
+        seen = set()
+        changed = False
+        try:
+            scan = list(os.scandir(SAVE_DIR))
+        except OSError:
+            scan = []
+        for dir_entry in scan:
+            name = dir_entry.name
+            if os.path.splitext(name)[1] not in SAVE_EXTENSIONS or not dir_entry.is_file():
+                continue
+            seen.add(name)
+            key = _file_key(dir_entry.stat())
+            entry = entries.get(name)
+            if entry is not None and (entry.get("mtime_ns"), entry.get("size")) == key:
+                continue
+            summary = read_save_summary(dir_entry.path) or save_summary({})
+            entries[name] = dict(summary, file=name, mtime_ns=key[0], size=key[1])
+            changed = True
+        for name in [name for name in entries if name not in seen]:
+            del entries[name]
+            changed = True
+        if changed:
+            _write_roster(entries)
+        _roster_dir_mtimes[SAVE_DIR] = _dir_mtime_ns() if changed else dir_mtime_ns
+    return sorted(entries.values(), key=lambda e: e["mtime_ns"], reverse=True)
+
+
+# --- SQLite Character Store ---
+
+class CharacterStore:
+    """Every character in one SQLite database, one row each.
+
+    Rows are keyed by save filename (so the rest of the game doesn't care
+    where a save lives) and hold the state as a .pqb blob (compressed,
+    strings interned) plus indexed summary columns for the roster. The
+    database runs in WAL mode: each save is one short transaction, readers
+    never block the writer, and several threads or processes can checkpoint
+    characters at the same time. Each thread gets its own connection.
+    The save journal is the `journal` table: a character's JSON records in
+    id order, compacted in the transaction that writes its next save.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS characters (
+            file TEXT PRIMARY KEY, name TEXT, race TEXT, class TEXT,
+            level INTEGER, act INTEGER, stamp REAL, updated_ns INTEGER,
+            size INTEGER, state BLOB NOT NULL);
+        CREATE INDEX IF NOT EXISTS characters_updated ON characters(updated_ns);
+        CREATE INDEX IF NOT EXISTS characters_level ON characters(level);
+        CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY, file TEXT NOT NULL, record TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS journal_file ON journal(file, id);
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; WAL keeps it consistent
+            self._local.conn = conn
+        return conn
+
+    def put(self, filename, data):
+        """Insert or replace a character's save and reset its journal, in one
+        transaction; returns success."""
+        try:
+            blob = bin_encode(data)
+            summary = save_summary(data)
+            with self._conn() as conn:
+                conn.execute("INSERT OR REPLACE INTO characters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (filename, summary["name"], summary["race"], summary["class"],
+                              summary["level"], summary["act"], summary["stamp"],
+                              time.time_ns(), len(blob), blob))
+                self._reset_journal(conn, filename, data.get("stamp"))
+            return True
+        except (sqlite3.Error, TypeError) as e:
+            print(f"Error saving {filename} to {self.path}: {e}")
+            return False
+
+    def get(self, filename):
+        """The .pqb bytes of a save, or None."""
+        row = self._conn().execute("SELECT state FROM characters WHERE file = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+    def exists(self, filename):
+        return self._conn().execute("SELECT 1 FROM characters WHERE file = ?", (filename,)).fetchone() is not None
+
+    def delete(self, filename):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM journal WHERE file = ?", (filename,))
+            return conn.execute("DELETE FROM characters WHERE file = ?", (filename,)).rowcount > 0
+
+    def _reset_journal(self, conn, filename, base):
+        conn.execute("DELETE FROM journal WHERE file = ?", (filename,))
+        conn.execute("INSERT INTO journal (file, record) VALUES (?, ?)",
+                     (filename, json.dumps({"base": base})))
+
+    def reset_journal(self, filename, base):
+        """Replace a character's journal with an empty one for the save stamped `base`."""
+        try:
+            with self._conn() as conn:
+                self._reset_journal(conn, filename, base)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error resetting journal of {filename} in {self.path}: {e}")
+            return False
+
+    def append_journal(self, filename, record):
+        """Add a journal record for a character; returns success."""
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT INTO journal (file, record) VALUES (?, ?)",
+                             (filename, json.dumps(record, separators=(',', ':'))))
+            return True
+        except (sqlite3.Error, TypeError) as e:
+            print(f"Error writing journal of {filename} to {self.path}: {e}")
+            return False
+
+    def read_journal(self, filename):
+        """A character's journal records as JSON strings, oldest first."""
+        return [row[0] for row in self._conn().execute(
+            "SELECT record FROM journal WHERE file = ? ORDER BY id", (filename,))]
+
+    def roster(self):
+        """get_roster() entries from the summary columns, most recently saved first."""
+        rows = self._conn().execute(
+            "SELECT file, name, race, class, level, act, stamp, updated_ns, size"
+            " FROM characters ORDER BY updated_ns DESC").fetchall()
+        keys = ("file", "name", "race", "class", "level", "act", "stamp", "mtime_ns", "size")
+        return [dict(zip(keys, row)) for row in rows]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store():
+    """The CharacterStore for SAVE_DIR/SQLITE_FILENAME (opened on first use)."""
+    path = SAVE_DIR / SQLITE_FILENAME
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CharacterStore(path)
+        return store
+
+def import_save(path, filename=None):
+    """Copy a .pqw/.pqb file into the current storage backend; returns the save's filename or None."""
+    path = Path(path)
+    data = _read_save_file(path, lazy_log=False)
+    if not data: return None
+    filename = filename or path.name
+    data.setdefault("stamp", 0)
+    data["logStore"] = None # Points into a log store on the machine it came from
+    return filename if write_checkpoint(data, filename) else None
+
+def export_save(filename, path, embed_log=False):
+    """Write a stored save (journal included) out as a .pqw or .pqb file, by
+    path's extension; returns success. A log kept in a log store is left out
+    unless `embed_log`, which puts all of it back into the file's `log`.
+
+    The save, its journal and its log store are only read: unlike load_game,
+    nothing is reset or truncated, so exporting a game that is running is safe.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        raw_data = get_store().get(filename)
+        data = bin_decode(raw_data) if raw_data is not None else None
+    else:
+        data, _ = _read_verified_save(filename, lazy_log=False)
+    if not data:
+        print(f"Save not found or unreadable: {filename}")
+        return False
+    game_state = GameState.from_pqw_dict(migrate_save(data))
+    for record in read_journal(filename, game_state.stamp) or ():
+        apply_delta(game_state, record)
+    data = to_pqw_dict(game_state)
+    if game_state.logStore is not None:
+        if embed_log: data["log"] = read_log_store(filename, game_state.logStore)
+        data["logStore"] = None # The store stays behind
+    try:
+        Path(path).write_bytes(encode_save(data, path))
+        return True
+    except OSError as e:
+        print(f"Error exporting {filename} to {path}: {e}")
+        return False
@@ -0,0 +1,149 @@
+"""Leaderboard report for a directory tree of Progress Quest saves.
+
+Walks the given directories for .pqw (and .pqb) files, reads each one in a
+process pool and writes a sorted leaderboard as CSV or JSON. Only the summary
+fields are decoded: .pqw files are memory-mapped and streamed with
+game.PqwStream, which stops as soon as it has them, so the event log and
+the rest of the save are never parsed. Files that can't be read are reported
+on stderr and left out.
+
+Example:
+    python leaderboard.py saves/ backups/ --sort level --top 100 --output board.csv
+    python leaderboard.py savegame --format json
+"""
+import argparse
+import base64
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import game
+
+# Top-level save fields the leaderboard needs
+SUMMARY_FIELDS = ("Traits", "act", "elapsed", "tasks", "Inventory", "bestequip")
+COLUMNS = ("rank", "name", "race", "class", "level", "act", "elapsed", "tasks", "gold", "bestequip", "file")
+SORT_KEYS = ("level", "act", "elapsed", "tasks", "gold")
+
+
+def find_saves(roots):
+    """Yield the path of every save file under `roots` (files are taken as is)."""
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            # Hidden directories (savegame/.snapshots) hold copies of saves, not more characters
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for name in sorted(filenames):
+                if name.lower().endswith(game.SAVE_EXTENSIONS):
+                    yield os.path.join(dirpath, name)
+
+
+def read_fields(path):
+    """The SUMMARY_FIELDS of one save file as a dict."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(game.BINARY_MAGIC)] == game.BINARY_MAGIC: # .pqb: no partial decoding
+                data = game.bin_decode(mm[:])
+                if not isinstance(data, dict): raise ValueError("not a save file")
+                return data
+            return dict(game.PqwStream(mm).items(only=SUMMARY_FIELDS))
+
+
+def summarize(path):
+    """Leaderboard row for one save, or (path, error) if it can't be read (runs in a worker)."""
+    try:
+        return _summary_row(path, read_fields(path))
+    except (OSError, ValueError, base64.binascii.Error) as e: # Empty files fail to mmap with ValueError
+        return path, str(e)
+    except (AttributeError, TypeError, IndexError, KeyError) as e: # Decodes, but isn't shaped like a save
+        return path, f"unexpected save contents ({type(e).__name__}: {e})"
+
+
+def _summary_row(path, data):
+    traits = data.get("Traits") or {}
+    gold = 0
+    for row in data.get("Inventory") or ():
+        if row and row[0] == "Gold":
+            gold = game.str_to_int_def(row[1], 0)
+            break
+    return {
+        "name": str(traits.get("Name", "")),
+        "race": str(traits.get("Race", "")),
+        "class": str(traits.get("Class", "")),
+        "level": game.str_to_int_def(traits.get("Level", 0), 0),
+        "act": game.str_to_int_def(data.get("act", 0), 0),
+        "elapsed": game.str_to_int_def(data.get("elapsed", 0), 0),
+        "tasks": game.str_to_int_def(data.get("tasks", 0), 0),
+        "gold": gold,
+        "bestequip": str(data.get("bestequip", "")),
+        "file": path,
+    }
+
+
+def rank(rows, sort_key, top=None):
+    """Sort rows best first by `sort_key` (then level, act, elapsed time and tasks,
+    then name) and number them."""
+    rows = sorted(rows, key=lambda r: (-r[sort_key], -r["level"], -r["act"], -r["elapsed"], -r["tasks"],
+                                       r["name"].lower(), r["file"]))
+    if top: rows = rows[:top]
+    for i, row in enumerate(rows, 1):
+        row["rank"] = i
+    return rows
+
+
+def write_report(rows, out, fmt):
+    if fmt == "json":
+        json.dump([{col: row[col] for col in COLUMNS} for row in rows], out, indent=1)
+        out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames=COLUMNS, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build a leaderboard from a tree of save files.")
+    parser.add_argument("roots", nargs="+", help="directories (searched recursively) or save files")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="level", help="ranking field (default level)")
+    parser.add_argument("--top", type=int, help="keep only the first N characters")
+    parser.add_argument("--format", choices=("csv", "json"), help="output format (default: from --output, else csv)")
+    parser.add_argument("--output", help="report file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = args.format or ("json" if args.output and args.output.lower().endswith(".json") else "csv")
+    paths = list(find_saves(args.roots))
+
+    start = time.perf_counter()
+    rows, failed = [], 0
+    chunksize = max(1, len(paths) // (4 * max(1, args.workers)))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for result in pool.map(summarize, paths, chunksize=chunksize):
+            if isinstance(result, dict):
+                rows.append(result)
+            else:
+                failed += 1
+                print(f"Skipped {result[0]}: {result[1]}", file=sys.stderr)
+    rows = rank(rows, args.sort, args.top)
+    wall = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_report(rows, f, fmt)
+    else:
+        write_report(rows, sys.stdout, fmt)
+    print(f"Scanned {len(paths)} saves ({failed} skipped) in {wall:.2f}s"
+          + (f" -> {args.output}" if args.output else ""), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,57 +9,561 @@ from PySide6.QtWidgets import (
     QLabel, QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
     QPushButton, QDialog, QLineEdit, QRadioButton, QMessageBox, QListWidget,
     QListWidgetItem, QAbstractItemView, QSizePolicy, QSpacerItem, QMenuBar,
-    QMenu, QFileDialog, QTextEdit, QStyleFactory
+    QMenu, QFileDialog, QTextEdit, QStyleFactory, QProgressDialog, QTableView
+)
+from PySide6.QtCore import (
+    Qt, QTimer, QSize, QUrl, QObject, QRunnable, QThreadPool, QThread, Signal, Slot,
+    QAbstractTableModel, QModelIndex, QEvent
 )
-from PySide6.QtCore import Qt, QTimer, QSize, QUrl
 from PySide6.QtGui import QIcon, QPalette, QDesktopServices, QAction # For styling and icons
 
 import game # Import the non-GUI logic
 
 # --- Constants ---
-TICK_INTERVAL_MS = 50  # Match clock.js interval
-SAVE_INTERVAL_SEC = 60 # Auto-save every minute
+TICK_INTERVAL_MS = 50  # Default simulation step, matching the clock.js interval
+RENDER_INTERVAL_MS = 50 # Default UI refresh interval (also capped by the screen's refresh rate)
+SIM_RATES_HZ = [5, 10, 20, 50, 100] # Choices in View -> Simulation Rate
+RENDER_RATES_HZ = [1, 5, 10, 20, 30, 60] # Choices in View -> Render Rate
+MAX_STEP_MS = 200 # Longest step one tick may advance the game (at least two tick intervals)
+SAVE_INTERVAL_SEC = 60 # Auto-save (full snapshot, compacts the journal) every minute
+JOURNAL_INTERVAL_SEC = 5 # Append changes to the save journal this often
 REPOSITORY_URL = "https://github.com/fernicar/PQ_TINS_Edition"
 STYLE_THEMES = ['Windows', 'windowsvista', 'windows11', 'Fusion']
 STYLE_SELECTED_THEME = STYLE_THEMES[3]  # Fusion style by default
 COLOR_SCHEMES = ['Auto', 'Light', 'Dark']
 DEFAULT_COLOR_SCHEME = COLOR_SCHEMES[0]  # Auto by default
+CATCH_UP_ON_LOAD = True # Replay the time a save sat on disk (disable with --no-catch-up)
+CATCH_UP_MIN_SEC = 60 # Don't bother catching up on shorter absences
 
 # --- Helper Functions ---
 
 def find_most_recent_pqw_file():
-    """Find the most recent .pqw file in the savegame directory."""
-    save_files = list(game.SAVE_DIR.glob("*.pqw"))
-    if not save_files: return None
-    # Sort by modification time, newest first
-    save_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-    return save_files[0].name
+    """Find the most recent save file (.pqw or .pqb) in the savegame directory."""
+    roster = game.get_roster() # Newest first, from the roster index
+    return roster[0]["file"] if roster else None
+
+# --- Background Saving ---
+
+class SaveSignals(QObject):
+    """Signals for background saves (a QRunnable can't emit signals itself)."""
+    finished = Signal(str, bool, float) # filename, success, latency in ms
+    log_loaded = Signal(object) # EventLog whose saved entries were read
+
+class SaveTask(QRunnable):
+    """Encode and atomically write a .pqw snapshot on a pool thread, then compact the journal."""
+    def __init__(self, data, filename, started, signals):
+        super().__init__()
+        self.data = data # Snapshot from game.snapshot_pqw_dict, not shared with the game
+        self.filename = filename
+        self.started = started # perf_counter() when the snapshot was taken
+        self.signals = signals
+
+    def run(self):
+        saved = game.write_checkpoint(self.data, self.filename)
+        self.signals.finished.emit(self.filename, saved, (time.perf_counter() - self.started) * 1000)
+
+class JournalTask(QRunnable):
+    """Append a game.take_delta record to the save journal on a pool thread."""
+    def __init__(self, record, filename):
+        super().__init__()
+        self.record = record
+        self.filename = filename
+
+    def run(self):
+        game.append_journal(self.record, self.filename)
+
+class LogLoadTask(QRunnable):
+    """Read the saved event log of a lazily loaded game on a pool thread."""
+    def __init__(self, log, signals):
+        super().__init__()
+        self.log = log
+        self.signals = signals
+
+    def run(self):
+        self.log.fetch_older()
+        self.signals.log_loaded.emit(self.log)
+
+# --- Game Engine ---
+
+BAR_IDS = ("Exp", "Encum", "Plot", "Quest", "Task")
+
+class GameEngine(QObject):
+    """Runs the game on a worker thread and hands the window frames to draw.
+
+    The engine owns the game state: the simulation clock, autosaves, journal
+    records, loading and offline catch-up all run on its thread, and the
+    window talks to it only through queued signals. A frame is a dict of
+    what changed since the previous frame, built from strings, numbers and
+    tuples, so nothing in it is shared with the game state.
+
+    While the window is hidden the engine runs in coarse mode: instead of
+    ticking every sim interval it sleeps until the tick on which the current
+    task finishes, then replays the ticks in between with game.simulate.
+    """
+    frame_ready = Signal(object) # Frame dict, see build_frame()
+    saved = Signal(bool) # Answer to save()
+    exported = Signal(bool, str) # Success, export path
+    load_finished = Signal(bool, str) # Success, filename
+    catch_up_started = Signal(int, str) # Seconds to simulate, rough time away
+    catch_up_progress = Signal(int) # Seconds simulated so far
+    catch_up_finished = Signal(str) # Summary for the welcome back message
+
+    def __init__(self, game_state, parent=None):
+        super().__init__(parent)
+        self.game_state = game_state
+        self.sim_interval_ms = TICK_INTERVAL_MS
+        self.last_tick_time = time.monotonic() * 1000 # ms
+        self.next_save_at = time.monotonic() + SAVE_INTERVAL_SEC # Full snapshot due (monotonic seconds)
+        self.next_journal_at = time.monotonic() + JOURNAL_INTERVAL_SEC # Journal record due
+        self.catch_up_cancelled = False # Set from the GUI thread to stop a catch-up
+        self.running = False # Clock started (and not shut down)
+        self.coarse = False # Wake only when a task finishes (window hidden)
+        self.shutdown_saved = None # Result of the save in shutdown()
+
+        # Autosaves are encoded and written on a single pool thread, in order
+        self.save_pool = QThreadPool(self)
+        self.save_pool.setMaxThreadCount(1)
+        self.save_signals = SaveSignals(self)
+        self.save_signals.finished.connect(self._on_save_finished)
+        self.save_signals.log_loaded.connect(self._on_log_loaded) # Merged on the engine thread
+        self.last_save_snapshot_ms = None # Engine thread time of the last autosave
+        self.last_save_latency_ms = None # Snapshot to durable file
+
+        # What the window was last sent, so frames only carry changes
+        self._sent_state = None # Game state sent; another one means a full frame
+        self._sent_versions = {} # game_state.versions section -> version sent
+        self._sent_bars = {}
+        self._sent_kill = None
+        self._sent_quests = (0, 0) # game_state.quests_trimmed and len(Quests) sent
+        self._sent_log_store = None
+        self._sent_spells = self._sent_inventory = None # Collections the edit feeds follow
+        self._sent_spells_version = self._sent_inventory_version = 0
+
+        self.timer = QTimer(self) # Moves to the engine thread with its parent
+        self.timer.timeout.connect(self._tick)
+        self.wake_timer = QTimer(self) # Coarse mode: end of the current task
+        self.wake_timer.setSingleShot(True)
+        self.wake_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.wake_timer.timeout.connect(self._wake)
+
+    # Slots below run on the engine thread
+
+    @Slot()
+    def start(self):
+        """Catch up on the time the save sat on disk, then start the simulation clock."""
+        self._load_log_later()
+        self._catch_up()
+        self.last_tick_time = time.monotonic() * 1000
+        self.running = True
+        self._start_clock()
+
+    @Slot(int)
+    def set_sim_interval(self, interval_ms):
+        self.sim_interval_ms = interval_ms
+        self.timer.setInterval(interval_ms)
+        if self.running and self.coarse: self._schedule_wake()
+
+    @Slot(bool)
+    def set_coarse(self, coarse):
+        """Switch between ticking every sim interval and waking once per task."""
+        if coarse == self.coarse: return
+        self.coarse = coarse
+        if not self.running: return # start() or resume() picks the mode up
+        self._advance() # Bring the game up to now before switching clocks
+        self._start_clock()
+
+    @Slot()
+    def request_frame(self):
+        self.frame_ready.emit(self.build_frame())
+
+    @Slot()
+    def save(self):
+        self.saved.emit(self._save_now())
+
+    @Slot(str, bool)
+    def export(self, path, embed_log):
+        """Save, then write the current character to `path`."""
+        exported = self._save_now() and game.export_save(game.save_filename(self.game_state), path, embed_log)
+        self.exported.emit(bool(exported), path)
+
+    @Slot(str, bool)
+    def load(self, filename, catch_up):
+        """Save the current game, then switch to `filename` (optionally catching up on it)."""
+        self._save_now()
+        new_game_state = game.load_game(filename, lazy_log=True) # The event log loads in the background
+        if not new_game_state:
+            self.load_finished.emit(False, filename)
+            return
+        self.game_state = new_game_state
+        self._load_log_later()
+        if catch_up: self._catch_up()
+        self.last_tick_time = time.monotonic() * 1000
+        self.next_save_at = time.monotonic() + SAVE_INTERVAL_SEC
+        if self.running: self._start_clock() # A coarse wake-up follows the new task
+        self.load_finished.emit(True, filename)
+
+    @Slot()
+    def shutdown(self):
+        """Stop the clock and save synchronously (the window waits for this)."""
+        self.running = False
+        self.timer.stop()
+        self.wake_timer.stop()
+        self.shutdown_saved = self._save_now()
+
+    @Slot()
+    def resume(self):
+        """Restart the clock after a shutdown() the user backed out of."""
+        self.last_tick_time = time.monotonic() * 1000
+        self.running = True
+        self._start_clock()
+
+    def cancel_catch_up(self):
+        """Stop a running catch-up early (safe to call from the GUI thread)."""
+        self.catch_up_cancelled = True
+
+    # Engine internals
+
+    def _tick(self):
+        """Simulation clock: advance the game by the real time since the last tick."""
+        current_time = time.monotonic() * 1000
+        elapsed = current_time - self.last_tick_time
+        # Clamp elapsed time to avoid large jumps if paused/lagged
+        elapsed = max(0, min(elapsed, max(MAX_STEP_MS, 2 * self.sim_interval_ms)))
+        self.last_tick_time = current_time
+
+        game.process_tick(self.game_state, elapsed)
+        self._save_if_due(current_time / 1000)
+
+    def _start_clock(self):
+        """Run the tick timer, or in coarse mode the wake-up at the end of the current task."""
+        if self.coarse:
+            self.timer.stop()
+            self._schedule_wake()
+        else:
+            self.wake_timer.stop()
+            self.timer.start(self.sim_interval_ms)
+
+    def _advance(self):
+        """Replay the whole sim intervals since the last tick, as the tick timer would have."""
+        current_time = time.monotonic() * 1000
+        ticks = int((current_time - self.last_tick_time) // self.sim_interval_ms)
+        if ticks > 0: # Overshoot at each task end is lost, as it is with the timer
+            game.simulate(self.game_state, ticks * self.sim_interval_ms / 1000, tick_msec=self.sim_interval_ms)
+            self.last_tick_time += ticks * self.sim_interval_ms # The part tick left over carries on
+        self._save_if_due(current_time / 1000)
+
+    def _schedule_wake(self):
+        """Sleep until the tick on which the current task finishes."""
+        task_bar = self.game_state.TaskBar
+        interval = self.sim_interval_ms
+        due = max(1, math.ceil((task_bar.max - task_bar.position) / interval)) * interval
+        waited = time.monotonic() * 1000 - self.last_tick_time
+        self.wake_timer.start(max(0, math.ceil(due - waited)))
+
+    def _wake(self):
+        """Coarse clock: catch up to the end of the current task and sleep until the next."""
+        self._advance()
+        self._schedule_wake()
+
+    def _save_if_due(self, now):
+        """Auto-save: a journal record every few seconds, a full snapshot every minute."""
+        if now >= self.next_save_at:
+            self._autosave()
+        elif now >= self.next_journal_at:
+            self._journal()
+        if now >= self.next_journal_at:
+            self.next_journal_at = now + JOURNAL_INTERVAL_SEC
+
+    def _catch_up(self):
+        """Fast-forward the time since the last save, reporting progress to the window."""
+        if not CATCH_UP_ON_LOAD: return
+        seconds = min(int(game.offline_seconds(self.game_state)), 2**31 - 1) # QProgressDialog range is int
+        if seconds < CATCH_UP_MIN_SEC: return
+
+        before = game.progress_summary(self.game_state)
+        self.catch_up_cancelled = False
+        self.catch_up_started.emit(seconds, game.rough_time(seconds))
+
+        def on_progress(done, total):
+            self.catch_up_progress.emit(int(done))
+            return not self.catch_up_cancelled
+
+        done = game.catch_up(self.game_state, seconds, on_progress)
+        summary = game.describe_progress(before, game.progress_summary(self.game_state), done)
+        self.catch_up_finished.emit("\n".join(summary))
+
+    def _save_now(self):
+        """Save synchronously, after any queued background save; returns success."""
+        self.save_pool.waitForDone() # An older snapshot must not land after this save
+        return game.save_game(self.game_state)
+
+    def _autosave(self):
+        """Snapshot the game on the engine thread and write it on the pool thread."""
+        started = time.perf_counter()
+        game.prepare_save(self.game_state)
+        data = game.snapshot_pqw_dict(self.game_state)
+        game.clear_changes(self.game_state) # The snapshot covers everything so far
+        self.last_save_snapshot_ms = (time.perf_counter() - started) * 1000
+        filename = game.save_filename(self.game_state)
+        self.save_pool.start(SaveTask(data, filename, started, self.save_signals))
+        self.next_save_at = time.monotonic() + SAVE_INTERVAL_SEC
+
+    def _load_log_later(self):
+        """Read a lazily loaded event log in the background (saves wait for it anyway)."""
+        if self.game_state.log.source is not None:
+            self.save_pool.start(LogLoadTask(self.game_state.log, self.save_signals))
+
+    def _on_log_loaded(self, log):
+        log.load_older() # Merges what the task read; no-op if a save already had to
+
+    def _journal(self):
+        """Queue a record of what changed since the last save or record."""
+        record = game.take_delta(self.game_state)
+        self.save_pool.start(JournalTask(record, game.save_filename(self.game_state)))
+
+    def _on_save_finished(self, filename, saved, latency_ms):
+        if not saved:
+            print(f"Autosave of {filename} failed")
+            return
+        self.last_save_latency_ms = latency_ms
+        print(f"Autosave of {filename} took {latency_ms:.1f} ms "
+              f"({self.last_save_snapshot_ms:.1f} ms on the engine thread)")
+
+    def _section_changed(self, section):
+        """Whether a game_state.versions section changed since the last frame."""
+        version = self.game_state.versions[section]
+        if self._sent_versions.get(section) == version: return False
+        self._sent_versions[section] = version
+        return True
+
+    def build_frame(self):
+        """What changed since the last frame, as plain values.
+
+        Sections are compared by their game_state.versions counter and the
+        bars and kill text by value, so a typical frame only carries the task
+        bar. Switching to another game state sends everything, with "reset".
+        """
+        game_state = self.game_state
+        frame = {}
+        if self._sent_state is not game_state: # New or reloaded character
+            self._sent_state = game_state
+            self._sent_versions = {}
+            self._sent_bars = {}
+            self._sent_kill = None
+            self._sent_quests = (game_state.quests_trimmed, 0)
+            frame["reset"] = True
+            frame["name"] = game_state.Traits["Name"]
+
+        if self._section_changed("Traits"):
+            frame["Traits"] = [str(game.get_trait(game_state, name)) for name in game.TRAITS]
+        if self._section_changed("Stats"):
+            frame["Stats"] = [str(game.get_stat(game_state, name)) for name in game.STATS]
+        if self._section_changed("Equips"):
+            frame["Equips"] = [game.get_equip(game_state, slot) for slot in game.EQUIPS]
+
+        bars = {}
+        for bar_id in BAR_IDS:
+            bar = game.get_bar(game_state, bar_id)
+            shown = (bar.max, bar.position)
+            if self._sent_bars.get(bar_id) == shown: continue # Unchanged since last frame
+            self._sent_bars[bar_id] = shown
+            bars[bar_id] = (bar.max, bar.position, bar.percent, bar.hint)
+        if bars: frame["bars"] = bars
+
+        if self._section_changed("Spells"):
+            frame["Spells"] = self._spells_update(game_state.Spells)
+        if self._section_changed("Inventory"):
+            frame["Inventory"] = self._inventory_update(game_state.Inventory)
+        if self._section_changed("act"):
+            frame["act"] = game_state.act
+        if self._section_changed("Quests"):
+            quests = game_state.Quests
+            trimmed, count = self._sent_quests
+            dropped = min(game_state.quests_trimmed - trimmed, count) # Shown quests trimmed since
+            frame["Quests"] = (dropped, tuple(quests[count - dropped:]))
+            self._sent_quests = (game_state.quests_trimmed, len(quests))
+        if self._sent_kill != game_state.kill:
+            self._sent_kill = frame["kill"] = game_state.kill
+        log_store = game_state.log.store is not None # Export asks about embedding the log
+        if self._sent_log_store != log_store:
+            self._sent_log_store = frame["log_store"] = log_store
+        return frame
+
+    def _spells_update(self, spells):
+        """("reset", rows) or ("edits", edits) for SpellsModel.apply()."""
+        edits = spells.edits_since(self._sent_spells_version) if spells is self._sent_spells else None
+        self._sent_spells, self._sent_spells_version = spells, spells.version
+        if edits is None:
+            return "reset", [(name, level) for name, level in spells]
+        return "edits", [(op, i, name, game.to_roman(spells.level(name))) for op, i, name in edits]
+
+    def _inventory_update(self, inventory):
+        """("reset", rows) or ("edits", edits) for InventoryModel.apply()."""
+        edits = inventory.edits_since(self._sent_inventory_version) if inventory is self._sent_inventory else None
+        self._sent_inventory, self._sent_inventory_version = inventory, inventory.version
+        if edits is None:
+            return "reset", [(name, qty) for name, qty in inventory]
+        return "edits", [(op, i, name, inventory.qty(name)) for op, i, name in edits]
+
+# --- Table Models ---
+
+class EditFeedTableModel(QAbstractTableModel):
+    """Two-column read-only model fed by the edit lists in engine frames.
+
+    It keeps the text of the rows it has announced, so views always see a
+    consistent table, and apply() replays a frame's edits, which carry their
+    row positions, as row inserts, removals and per-row dataChanged. A
+    "reset" update (new collection, or one that got too many edits ahead of
+    the last frame) resets the model.
+    """
+    HEADERS = ("", "")
+    ALIGNMENTS = (Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,) * 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = [] # [name text, value text] as shown
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return self.ALIGNMENTS[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def apply(self, update):
+        """Apply a frame's ("reset", rows) or ("edits", edits) update."""
+        kind, items = update
+        if kind == "reset":
+            self.beginResetModel()
+            self._rows = [self._row(*item) for item in items]
+            self.endResetModel()
+        else:
+            for edit in items:
+                self._apply(edit)
+
+    def _insert(self, i, row):
+        self.beginInsertRows(QModelIndex(), i, i)
+        self._rows.insert(i, row)
+        self.endInsertRows()
+
+    def _remove(self, i):
+        self.beginRemoveRows(QModelIndex(), i, i)
+        del self._rows[i]
+        self.endRemoveRows()
+
+    def _set(self, i, row):
+        changed = [c for c in range(2) if self._rows[i][c] != row[c]]
+        self._rows[i] = row
+        if changed: self.dataChanged.emit(self.index(i, changed[0]), self.index(i, changed[-1]))
+
+class InventoryModel(EditFeedTableModel):
+    """Inventory rows (item, quantity) in the game's display order."""
+    HEADERS = ("Item", "Qty")
+    ALIGNMENTS = (Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                  Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter) # Right align with indentation
+
+    @staticmethod
+    def _row(name, qty):
+        return ["  " + name, str(qty) + "  "] # Left/right indentation
+
+    def _apply(self, edit):
+        op, i, name, qty = edit
+        if op == "append": self._insert(i, self._row(name, qty))
+        elif op == "remove": self._remove(i)
+        else: self._set(i, self._row(name, qty))
+
+class SpellsModel(EditFeedTableModel):
+    """Spell book rows (spell, Roman numeral level), sorted by name."""
+    HEADERS = ("Spell", "Level")
+    ALIGNMENTS = (Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                  Qt.AlignmentFlag.AlignCenter) # Center Roman numerals
+
+    @staticmethod
+    def _row(name, level):
+        return ["  " + name, level] # Add left indentation
+
+    def _apply(self, edit):
+        op, i, name, level = edit
+        row = self._row(name, level)
+        if op == "insert": self._insert(i, row)
+        else: self._set(i, row)
 
 # --- Main Application Window ---
 
 class MainWindow(QMainWindow):
+    # Requests to the engine thread (queued, so the window never waits on the game)
+    frame_wanted = Signal()
+    save_requested = Signal()
+    export_requested = Signal(str, bool) # Path, embed the event log
+    load_requested = Signal(str, bool) # Filename, catch up on it
+    sim_interval_changed = Signal(int)
+    coarse_mode_changed = Signal(bool) # Window hidden or minimized
+    shutdown_requested = Signal() # Blocking: returns once the engine has saved
+    resume_requested = Signal()
+
     def __init__(self, game_state):
         super().__init__()
         # Set object name for CSS styling
         self.setObjectName("MainWindow")
-        self.game_state = game_state
-        self.last_tick_time = time.monotonic() * 1000 # ms
-        self.save_countdown = SAVE_INTERVAL_SEC * (1000 / TICK_INTERVAL_MS) # Ticks until save
-
-        # Initialize tracking variables for UI updates
-        self._previous_act = self.game_state.get("act", 0)
-
-        self.setWindowTitle(f"Progress Quest - {self.game_state['Traits']['Name']}")
+        self.sim_interval_ms = TICK_INTERVAL_MS
+        self.render_interval_ms = RENDER_INTERVAL_MS # As chosen; see _render_timer_interval()
+        self.character_name = game_state.Traits['Name'] # Kept up to date by frames
+        self.log_store = game_state.log.store is not None # Whether the save keeps its log in a store
+        self._frame_pending = False # A frame was requested and hasn't arrived yet
+        self._hidden = False # Hidden or minimized: no rendering, engine in coarse mode
+        self._catch_up_dialog = None
+
+        # The engine owns the game state from here on; the window only sees its frames
+        self.engine = GameEngine(game_state)
+        self.engine_thread = QThread(self)
+        self.engine.moveToThread(self.engine_thread)
+        self.engine_thread.started.connect(self.engine.start)
+        self.engine_thread.finished.connect(self.engine.deleteLater)
+        self.frame_wanted.connect(self.engine.request_frame)
+        self.save_requested.connect(self.engine.save)
+        self.export_requested.connect(self.engine.export)
+        self.load_requested.connect(self.engine.load)
+        self.sim_interval_changed.connect(self.engine.set_sim_interval)
+        self.coarse_mode_changed.connect(self.engine.set_coarse)
+        self.shutdown_requested.connect(self.engine.shutdown, Qt.ConnectionType.BlockingQueuedConnection)
+        self.resume_requested.connect(self.engine.resume)
+        self.engine.frame_ready.connect(self._on_frame)
+        self.engine.saved.connect(self._on_saved)
+        self.engine.exported.connect(self._on_exported)
+        self.engine.load_finished.connect(self._on_load_finished)
+        self.engine.catch_up_started.connect(self._on_catch_up_started)
+        self.engine.catch_up_progress.connect(self._on_catch_up_progress)
+        self.engine.catch_up_finished.connect(self._on_catch_up_finished)
+
+        # What update_ui last showed, for the lists it appends to
+        self._shown_act = None
+        self._current_quest = None # Text of the last quest shown
+
+        self.setWindowTitle(f"Progress Quest - {self.character_name}")
         # self.setWindowIcon(QIcon("path/to/icon.ico")) # Optional
 
         self._init_ui()
         self._create_menu_bar()
-        self.update_ui() # Initial UI population
 
-        # Setup timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._tick)
-        self.timer.start(TICK_INTERVAL_MS)
+        # Separate clocks: the engine thread steps the game, rendering asks it for frames
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self._render)
+        self.render_timer.start(self._render_timer_interval())
+        self._screen_signal_connected = False
+        self.engine_thread.start() # Catches up on time away, then starts the simulation clock
+        self._request_frame() # Initial UI population
 
     def _create_menu_bar(self):
         """Create the menu bar with File, View, and Help menus."""
@@ -83,6 +587,11 @@ class MainWindow(QMainWindow):
         save_game_action.triggered.connect(self._save_game)
         file_menu.addAction(save_game_action)
 
+        # Export Save File action (e.g. a web-compatible .pqw)
+        export_game_action = QAction("&Export Save File...", self)
+        export_game_action.triggered.connect(self._export_game)
+        file_menu.addAction(export_game_action)
+
         file_menu.addSeparator()
 
         # Exit action
@@ -123,6 +632,31 @@ class MainWindow(QMainWindow):
             style_menu.addAction(action)
             self.style_actions.append(action)
 
+        view_menu.addSeparator()
+
+        # Simulation and render rate submenus
+        sim_rate_menu = view_menu.addMenu("Simulation &Rate")
+        self.sim_rate_actions = []
+        for rate in SIM_RATES_HZ:
+            action = QAction(f"{rate} Hz", self)
+            action.setCheckable(True)
+            action.setData(rate)
+            action.setChecked(round(1000 / rate) == self.sim_interval_ms)
+            action.triggered.connect(lambda checked, r=rate: self._on_sim_rate_selected(r))
+            sim_rate_menu.addAction(action)
+            self.sim_rate_actions.append(action)
+
+        render_rate_menu = view_menu.addMenu("Render R&ate")
+        self.render_rate_actions = []
+        for rate in RENDER_RATES_HZ:
+            action = QAction(f"{rate} Hz", self)
+            action.setCheckable(True)
+            action.setData(rate)
+            action.setChecked(round(1000 / rate) == self.render_interval_ms)
+            action.triggered.connect(lambda checked, r=rate: self._on_render_rate_selected(r))
+            render_rate_menu.addAction(action)
+            self.render_rate_actions.append(action)
+
         # Help Menu
         help_menu = menu_bar.addMenu("&Help")
 
@@ -140,22 +674,14 @@ class MainWindow(QMainWindow):
         """Show the New Character dialog."""
         dialog = NewCharacterDialog(self)
         if dialog.exec():
-            game.save_game(self.game_state) # Save current game before switching
-
-            # Load the new character
-            new_filename = f"{dialog.new_game_state['Traits']['Name']}.pqw"
-            new_game_state = game.load_game(new_filename)
-            if new_game_state:
-                self.game_state = new_game_state
-                self.setWindowTitle(f"Progress Quest - {self.game_state['Traits']['Name']}")
-                self.update_ui()
-            else: QMessageBox.critical(self, "Load Error", f"Failed to load new character: {new_filename}")
+            # The dialog saved the new character; the engine saves the current one and switches
+            self.load_requested.emit(game.save_filename(dialog.new_game_state), False)
 
     def _load_game(self):
         """Show a file dialog to load a game."""
         file_path, _ = QFileDialog.getOpenFileName(self, "Load Progress Quest Save File",
             str(game.SAVE_DIR),  # Start in the savegame directory
-            "Progress Quest Save Files (*.pqw);;All Files (*.*)"
+            "Progress Quest Save Files (*.pqw *.pqb);;All Files (*.*)"
         )
 
         if file_path:
@@ -167,39 +693,74 @@ class MainWindow(QMainWindow):
             # Get just the filename for loading
             filename = file_path.name
 
-            # If the file is not in the savegame directory, read its content and save it there
-            if file_path.parent != game.SAVE_DIR:
-                try:
-                    # Read the file content
-                    with open(file_path, 'r') as source_file: file_content = source_file.read()
-
-                    # Save to the savegame directory
-                    dest_path = game.SAVE_DIR / filename
-                    with open(dest_path, 'w') as dest_file: dest_file.write(file_content)
-
-                    QMessageBox.information( self, "File Copied",
-                        f"File '{filename}' has been copied to the savegame directory."
-                    )
-                except Exception as e:
-                    QMessageBox.critical(self, "Copy Error", f"Failed to copy file: {e}")
+            if game.STORAGE_BACKEND == "sqlite": # Files are imported into the database
+                if not game.import_save(file_path):
+                    QMessageBox.critical(self, "Import Error", f"Failed to import save file: {file_path}")
                     return
+            # If the file is not in the savegame directory, save a copy there (with its checksum recorded)
+            elif file_path.parent != game.SAVE_DIR:
+                if not game.import_save(file_path):
+                    QMessageBox.critical(self, "Copy Error", f"Failed to copy save file: {file_path}")
+                    return
+                QMessageBox.information( self, "File Copied",
+                    f"File '{filename}' has been copied to the savegame directory."
+                )
 
-            # Save current game before loading new one
-            game.save_game(self.game_state)
+            # The engine saves the current game, loads the selected one and catches up on it
+            self.load_requested.emit(filename, True)
 
-            # Load the selected game
-            new_game_state = game.load_game(filename)
-            if new_game_state:
-                self.game_state = new_game_state
-                self.setWindowTitle(f"Progress Quest - {self.game_state['Traits']['Name']}")
-                self.update_ui()
-            else: QMessageBox.critical(self, "Load Error", f"Failed to Load .pqw File: {filename}")
+    def _on_load_finished(self, loaded, filename):
+        if not loaded: QMessageBox.critical(self, "Load Error", f"Failed to Load .pqw File: {filename}")
 
     def _save_game(self):
-        """Save the current game state."""
-        if game.save_game(self.game_state): QMessageBox.information(self, "Save .pqw File", "PQW File saved successfully.")
+        """Ask the engine to save the current game state."""
+        self.save_requested.emit()
+
+    def _on_saved(self, saved):
+        if saved: QMessageBox.information(self, "Save .pqw File", "PQW File saved successfully.")
         else: QMessageBox.critical(self, "Save Error", "Failed to Save .pqw File.")
 
+    def _export_game(self):
+        """Have the engine save, then write the character to a .pqw or .pqb file of the user's choice."""
+        default_path = str(Path.home() / f"{self.character_name}.pqw")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Progress Quest Save File", default_path,
+            "Web-compatible Save (*.pqw);;Compact Binary Save (*.pqb)")
+        if not file_path: return
+        if Path(file_path).suffix.lower() not in game.SAVE_EXTENSIONS: file_path += ".pqw"
+        embed_log = False
+        if self.log_store: # Only the store has the log
+            reply = QMessageBox.question(self, "Export Save File",
+                                         "Include the full event log in the exported file?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                         QMessageBox.StandardButton.No)
+            embed_log = reply == QMessageBox.StandardButton.Yes
+        self.export_requested.emit(file_path, embed_log)
+
+    def _on_exported(self, exported, file_path):
+        if exported: QMessageBox.information(self, "Export Save File", f"Exported to {file_path}")
+        else: QMessageBox.critical(self, "Export Error", f"Failed to export to {file_path}")
+
+    def _on_catch_up_started(self, seconds, away):
+        """Show a cancellable progress dialog while the engine catches up."""
+        dialog = QProgressDialog(f"Catching up on {away} away...", "Stop", 0, seconds, self)
+        dialog.setWindowTitle("Progress Quest - Catching Up")
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(self._cancel_catch_up)
+        self._catch_up_dialog = dialog
+
+    def _cancel_catch_up(self):
+        self.engine.cancel_catch_up() # Called directly: the engine thread is busy catching up
+
+    def _on_catch_up_progress(self, done):
+        if self._catch_up_dialog: self._catch_up_dialog.setValue(done)
+
+    def _on_catch_up_finished(self, summary):
+        if self._catch_up_dialog:
+            self._catch_up_dialog.close()
+            self._catch_up_dialog = None
+        QMessageBox.information(self, "Welcome Back", summary)
+
     def _visit_repository(self):
         """Open the repository URL in the default browser."""
         QDesktopServices.openUrl(QUrl(REPOSITORY_URL))
@@ -307,8 +868,9 @@ class MainWindow(QMainWindow):
         spell_layout = QVBoxLayout(spell_group)
         spell_layout.setSpacing(2)  # Reduce spacing
         spell_layout.setContentsMargins(0, 0, 0, 0)  # Reduce margins
-        self.spells_table = QTableWidget(0, 2) # Rows added dynamically
-        self.spells_table.setHorizontalHeaderLabels(["Spell", "Level"])
+        self.spells_model = SpellsModel(self)
+        self.spells_table = QTableView() # Rows come from the model
+        self.spells_table.setModel(self.spells_model)
         self.spells_table.verticalHeader().setVisible(False)
         self.spells_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.spells_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
@@ -367,8 +929,9 @@ class MainWindow(QMainWindow):
         inv_layout = QVBoxLayout(inv_group)
         inv_layout.setSpacing(2)  # Reduce spacing
         inv_layout.setContentsMargins(0, 0, 0, 0)  # Reduce margins
-        self.inventory_table = QTableWidget(0, 2) # Dynamic rows
-        self.inventory_table.setHorizontalHeaderLabels(["Item", "Qty"])
+        self.inventory_model = InventoryModel(self)
+        self.inventory_table = QTableView() # Rows come from the model
+        self.inventory_table.setModel(self.inventory_model)
         self.inventory_table.verticalHeader().setVisible(False)
         self.inventory_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.inventory_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
@@ -458,169 +1021,209 @@ class MainWindow(QMainWindow):
         top_hbox.setStretchFactor(right_vbox, 20) # Right column (Plot, Quests) - give more space
 
 
-    def _tick(self):
-        current_time = time.monotonic() * 1000
-        elapsed = current_time - self.last_tick_time
-        # Clamp elapsed time to avoid large jumps if paused/lagged
-        elapsed = max(0, min(elapsed, 200)) # Clamp between 0 and 200ms
-        self.last_tick_time = current_time
-
-        game.process_tick(self.game_state, elapsed)
-        self.update_ui()
-
-        # Auto-save
-        self.save_countdown -= 1
-        if self.save_countdown <= 0:
-            game.save_game(self.game_state)
-            self.save_countdown = SAVE_INTERVAL_SEC * (1000 / TICK_INTERVAL_MS)
-
-
-    def update_ui(self):
-        # Update Traits Table
-        for i, trait_name in enumerate(game.TRAITS):
-            value = game.get_trait(self.game_state, trait_name)
-            item = self.traits_table.item(i, 1)
-            if item: item.setText("  " + str(value))  # Add left indentation
-            else:
-                item = QTableWidgetItem("  " + str(value))  # Add left indentation
-                self.traits_table.setItem(i, 1, item)
-
-        # Update Stats Table
-        for i, stat_name in enumerate(game.STATS):
-            value = game.get_stat(self.game_state, stat_name)
-            item = self.stats_table.item(i, 1)
-            if item: item.setText("  " + str(value))  # Add left indentation
-            else:
-                item = QTableWidgetItem("  " + str(value))  # Add left indentation
-                self.stats_table.setItem(i, 1, item)
+    def _render(self):
+        """Render clock: ask the engine for a frame, unless nobody can see it."""
+        if self.isVisible() and not self.isMinimized():
+            self._request_frame()
+
+    def _request_frame(self):
+        """Ask the engine for a frame, unless the last one hasn't arrived yet."""
+        if self._frame_pending: return # The engine is busy (e.g. loading); don't queue more
+        self._frame_pending = True
+        self.frame_wanted.emit()
+
+    def _on_frame(self, frame):
+        self._frame_pending = False
+        self.update_ui(frame)
+
+    def _render_timer_interval(self):
+        """The chosen render interval, but no faster than the screen refreshes."""
+        screen = self.screen()
+        refresh_hz = screen.refreshRate() if screen else 0
+        if refresh_hz <= 0: return self.render_interval_ms
+        return max(self.render_interval_ms, math.ceil(1000 / refresh_hz))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._screen_signal_connected and self.windowHandle():
+            # Follow the refresh rate of whichever screen the window is on
+            self.windowHandle().screenChanged.connect(self._update_render_timer)
+            self._screen_signal_connected = True
+        self._update_render_timer()
+        self._update_hidden()
+        self._request_frame() # Don't wait a render interval to show current state
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_hidden()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange: # Minimized or restored
+            self._update_hidden()
+
+    def _update_hidden(self):
+        """Stop rendering and let the engine sleep between tasks while nobody can see the window.
+
+        Frames carry everything that changed since the last one, so the first
+        frame after the window comes back brings every widget up to date.
+        """
+        hidden = not self.isVisible() or self.isMinimized()
+        if hidden == self._hidden: return
+        self._hidden = hidden
+        self.coarse_mode_changed.emit(hidden)
+        if hidden: self.render_timer.stop()
+        else:
+            self.render_timer.start(self._render_timer_interval())
+            self._request_frame()
+
+    def _update_render_timer(self, *args):
+        self.render_timer.setInterval(self._render_timer_interval())
+
+    def _on_sim_rate_selected(self, rate):
+        """Handles simulation rate selection."""
+        self.sim_interval_ms = round(1000 / rate)
+        self.sim_interval_changed.emit(self.sim_interval_ms)
+        for action in self.sim_rate_actions:
+            action.setChecked(action.data() == rate)
+
+    def _on_render_rate_selected(self, rate):
+        """Handles render rate selection."""
+        self.render_interval_ms = round(1000 / rate)
+        self._update_render_timer()
+        for action in self.render_rate_actions:
+            action.setChecked(action.data() == rate)
+
+
+    def update_ui(self, frame):
+        """Apply an engine frame: only the widgets whose data is in it are touched.
+
+        The engine leaves out whatever is unchanged since its previous frame,
+        so a typical frame only carries the task bar. A "reset" frame (new or
+        reloaded character) carries everything and clears the lists first.
+        """
+        if frame.get("reset"): # New or reloaded character
+            self.character_name = frame["name"]
+            self.setWindowTitle(f"Progress Quest - {self.character_name}")
+            self._shown_act = None
+            self._current_quest = None
+            self.plots_list.clear()
+            self.quests_list.clear()
+        if "log_store" in frame:
+            self.log_store = frame["log_store"]
+
+        # Update Traits, Stats and Equipment Tables
+        for key, table in (("Traits", self.traits_table), ("Stats", self.stats_table),
+                           ("Equips", self.equips_table)):
+            values = frame.get(key)
+            if values is None: continue
+            for i, value in enumerate(values):
+                item = table.item(i, 1)
+                if item: item.setText("  " + value)  # Add left indentation
+                else:
+                    item = QTableWidgetItem("  " + value)  # Add left indentation
+                    table.setItem(i, 1, item)
 
         # Update Progress Bars
-        for bar_id, bar_widget in [("Exp", self.exp_bar), ("Encum", self.encum_bar),
-                                   ("Plot", self.plot_bar), ("Quest", self.quest_bar),
-                                   ("Task", self.task_bar)]:
-            bar_data = self.game_state.get(f"{bar_id}Bar", {})
-            bar_widget.setMaximum(bar_data.get("max", 1))
-            bar_widget.setValue(int(bar_data.get("position", 0))) # Use int for progress bar value
-            bar_widget.setToolTip(bar_data.get("hint", ""))
+        bar_widgets = {"Exp": self.exp_bar, "Encum": self.encum_bar, "Plot": self.plot_bar,
+                       "Quest": self.quest_bar, "Task": self.task_bar}
+        for bar_id, (maximum, position, percent, hint) in frame.get("bars", {}).items():
+            bar_widget = bar_widgets[bar_id]
+            bar_widget.setMaximum(maximum)
+            bar_widget.setValue(int(position)) # Use int for progress bar value
+            bar_widget.setToolTip(hint)
             # Custom format for different bars
             if bar_id == "Encum": # Encumbrance bar shows current/max cubits
-                bar_widget.setFormat(f"{int(bar_data.get('position', 0))}/{int(bar_data.get('max', 1))} cubits")
+                bar_widget.setFormat(f"{int(position)}/{int(maximum)} cubits")
             elif bar_id == "Quest": # Quest bar shows percentage complete
-                bar_widget.setFormat(f"{bar_data.get('percent', 0)}% complete")
+                bar_widget.setFormat(f"{percent}% complete")
             elif bar_id == "Exp": # Experience bar shows hint text + percentage
-                hint = bar_data.get('hint', '')
                 if hint: # Extract the XP needed part from the hint
                     xp_needed = hint.split(' XP needed')[0]
-                    bar_widget.setFormat(f"{xp_needed} XP needed - {bar_data.get('percent', 0)}%")
-                else: bar_widget.setFormat(f"{bar_data.get('percent', 0)}%")
+                    bar_widget.setFormat(f"{xp_needed} XP needed - {percent}%")
+                else: bar_widget.setFormat(f"{percent}%")
             elif bar_id == "Plot":
                 # Plot bar shows hint text + percentage
-                hint = bar_data.get('hint', '')
-                if hint: bar_widget.setFormat(f"{hint} - {bar_data.get('percent', 0)}%")
-                else: bar_widget.setFormat(f"{bar_data.get('percent', 0)}%")
+                if hint: bar_widget.setFormat(f"{hint} - {percent}%")
+                else: bar_widget.setFormat(f"{percent}%")
             else: # Task uses percentage only
-                bar_widget.setFormat(f"{bar_data.get('percent', 0)}%")
-
-
-        # Update Spells Table
-        spells = self.game_state.get("Spells", [])
-        self.spells_table.setRowCount(len(spells))
-        for i, (name, level) in enumerate(spells):
-            item_name = self.spells_table.item(i, 0)
-            item_level = self.spells_table.item(i, 1)
-            if not item_name:
-                item_name = QTableWidgetItem()
-                self.spells_table.setItem(i, 0, item_name)
-            if not item_level:
-                item_level = QTableWidgetItem()
-                item_level.setTextAlignment(Qt.AlignmentFlag.AlignCenter) # Center Roman numerals
-                self.spells_table.setItem(i, 1, item_level)
-            item_name.setText("  " + name)  # Add left indentation
-            item_level.setText(level)  # Keep centered Roman numerals as is
-
-        # Update Equipment Table
-        for i, equip_slot in enumerate(game.EQUIPS):
-            item_name = game.get_equip(self.game_state, equip_slot)
-            item_widget = self.equips_table.item(i, 1)
-            if item_widget: item_widget.setText("  " + item_name)  # Add left indentation
-            else:
-                item = QTableWidgetItem("  " + item_name)  # Add left indentation
-                self.equips_table.setItem(i, 1, item)
-
-        # Update Inventory Table
-        inventory = self.game_state.get("Inventory", [])
-        self.inventory_table.setRowCount(len(inventory))
-        for i, (name, qty) in enumerate(inventory):
-            item_name = self.inventory_table.item(i, 0)
-            item_qty = self.inventory_table.item(i, 1)
-            if not item_name:
-                item_name = QTableWidgetItem()
-                self.inventory_table.setItem(i, 0, item_name)
-            if not item_qty:
-                item_qty = QTableWidgetItem()
-                item_qty.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter) # Right align with indentation
-                self.inventory_table.setItem(i, 1, item_qty)
-            item_name.setText("  " + name)  # Add left indentation
-            item_qty.setText(str(qty) + "  ")  # Add right indentation
+                bar_widget.setFormat(f"{percent}%")
+
+        # Update Spells and Inventory Tables (only the rows that changed)
+        if "Spells" in frame:
+            self.spells_model.apply(frame["Spells"])
+        if "Inventory" in frame:
+            self.inventory_model.apply(frame["Inventory"])
 
         # Update Plots List (Show all acts up to current, like in web version)
-        self.plots_list.clear()
-        current_act = self.game_state.get("act", 0)
+        if "act" in frame:
+            self._update_plots(frame["act"])
 
-        # Add all acts from Prologue (act 0) to current act (max 99 acts)
-        for i in range(max(0, current_act-99), current_act + 1):
-            if i == 0: act_str = "Prologue"
-            else: # Convert act number to Roman numeral
-                act_str = f"Act {game.to_roman(i)}"
+        # Update Quests List
+        if "Quests" in frame:
+            self._update_quests(frame["Quests"])
 
-            # Add icon based on status
-            if i < current_act:  # Completed act
-                item = QListWidgetItem("  ✓  " + act_str)  # Checkmark for completed
-            elif i == current_act:  # Current act
-                item = QListWidgetItem("  ►  " + act_str)  # Triangle for current
-            else:  # Future act (shouldn't happen normally)
-                item = QListWidgetItem("     " + act_str)  # Just indentation
+        # Update Kill Label
+        if "kill" in frame:
+            self.kill_label.setText(frame["kill"])
 
-            self.plots_list.addItem(item)
+    def _update_plots(self, current_act):
+        """Append acts reached since the last update, instead of rebuilding the list."""
+        first_act = max(0, current_act - 99) # Show at most 100 acts
 
-        # Only scroll to the bottom when a new act is added
-        current_act = self.game_state.get("act", 0)
-        previous_act = getattr(self, "_previous_act", 0)
-        if current_act > previous_act:
+        def act_text(i):
+            act_str = "Prologue" if i == 0 else f"Act {game.to_roman(i)}" # Convert act number to Roman numeral
+            # Add icon based on status
+            if i < current_act: return "  ✓  " + act_str # Checkmark for completed
+            return "  ►  " + act_str # Triangle for current
+
+        previous_act = self._shown_act
+        self._shown_act = current_act
+        if previous_act is None or current_act < previous_act: # First fill (or an act went back)
+            self.plots_list.clear()
+            for i in range(first_act, current_act + 1):
+                self.plots_list.addItem(QListWidgetItem(act_text(i)))
             self.plots_list.scrollToBottom()
-            self._previous_act = current_act
-
-        # Update Quests List
-        quests = self.game_state.get("Quests", [])
-        old_quest_count = self.quests_list.count()
-        self.quests_list.clear()
-
-        # Get current quest progress
-        quest_bar_data = self.game_state.get("QuestBar", {})
-        quest_percent = quest_bar_data.get("percent", 0)  # Used below for quest completion status
-
-        for i, quest_desc in enumerate(quests):
+            return
+        if current_act == previous_act: return
+        last = self.plots_list.item(self.plots_list.count() - 1)
+        if last: last.setText(act_text(previous_act)) # No longer current
+        for i in range(max(first_act, previous_act + 1), current_act + 1):
+            self.plots_list.addItem(QListWidgetItem(act_text(i)))
+        while self.plots_list.count() > current_act - first_act + 1:
+            self.plots_list.takeItem(0)
+        # Only scroll to the bottom when a new act is added
+        self.plots_list.scrollToBottom()
+
+    def _update_quests(self, update):
+        """Append new quests, dropping the ones the game trimmed from the front."""
+        dropped, quests = update # Shown quests the game trimmed (it keeps the last 100), new ones
+        for _ in range(dropped):
+            self.quests_list.takeItem(0)
+        if not quests: return
+        kept = self.quests_list.count()
+        if kept: # The previous current quest is completed now
+            self.quests_list.item(kept - 1).setText("  ✓  " + self._current_quest)
+        self._current_quest = quests[-1]
+        for i in range(len(quests)):
             # Add icon based on status
             if i < len(quests) - 1:  # Completed quests
-                item = QListWidgetItem("  ✓  " + quest_desc)  # Checkmark for completed
+                item = QListWidgetItem("  ✓  " + quests[i])  # Checkmark for completed
             else:  # Current quest
-                item = QListWidgetItem("  ►   " + quest_desc)  # Triangle for current
-
+                item = QListWidgetItem("  ►   " + quests[i])  # Triangle for current
             self.quests_list.addItem(item)
 
         # Only scroll to bottom if new quests were added
-        if len(quests) > old_quest_count:
-            self.plots_list.scrollToBottom() # Show latest act
-            self.quests_list.scrollToBottom() # Show latest quest
-
-        # Update Kill Label
-        self.kill_label.setText(self.game_state.get("kill", ""))
+        self.plots_list.scrollToBottom() # Show latest act
+        self.quests_list.scrollToBottom() # Show latest quest
 
     def closeEvent(self, event):
         """Handle window closing."""
-        self.timer.stop()
-        # Automatically save on close
-        saved = game.save_game(self.game_state)
+        self.render_timer.stop()
+        self.engine.cancel_catch_up() # Don't make the user sit through the rest of one
+        # Automatically save on close; blocks until the engine has made the file durable
+        self.shutdown_requested.emit()
+        saved = self.engine.shutdown_saved
         if not saved:
              # Optional: Ask user if they want to quit anyway if save failed
              reply = QMessageBox.warning(self, "Save Failed",
@@ -629,9 +1232,12 @@ class MainWindow(QMainWindow):
                                          QMessageBox.StandardButton.No)
              if reply == QMessageBox.StandardButton.No:
                   event.ignore()
-                  self.timer.start(TICK_INTERVAL_MS) # Restart timer if not quitting
+                  self.resume_requested.emit() # Restart clocks if not quitting
+                  self.render_timer.start(self._render_timer_interval())
                   return
 
+        self.engine_thread.quit()
+        self.engine_thread.wait()
         event.accept() # Proceed with closing
         # After closing, we might want to show the roster again
         # This requires more application structure (e.g., a central controller)
@@ -893,8 +1499,8 @@ class NewCharacterDialog(QDialog):
             return # Should not happen with default checks
 
         # Check if character name already exists
-        save_filename = f"{name}.pqw"
-        if (game.SAVE_DIR / save_filename).exists():
+        save_filename = f"{name}{game.SAVE_FORMAT}"
+        if game.save_exists(save_filename):
              reply = QMessageBox.question(self, "Character Exists",
                                           f"A character named '{name}' already exists. Overwrite?",
                                           QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -912,6 +1518,9 @@ class NewCharacterDialog(QDialog):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    if "--no-catch-up" in sys.argv: CATCH_UP_ON_LOAD = False
+    if "--binary-saves" in sys.argv: game.SAVE_FORMAT = ".pqb" # New characters save as .pqb
+    if "--sqlite" in sys.argv: game.STORAGE_BACKEND = "sqlite" # All characters in savegame/characters.db
     
     # Force style for consistent look
     app.setStyle(QStyleFactory.create(STYLE_SELECTED_THEME))
@@ -923,8 +1532,8 @@ if __name__ == "__main__":
     recent_file = find_most_recent_pqw_file()
 
     if recent_file: # Load the most recent game
-        game_state = game.load_game(recent_file)
-        if game_state:
+        game_state = game.load_game(recent_file, lazy_log=True) # The event log loads in the background
+        if game_state: # The engine thread catches up on the time away once the window is up
             main_win = MainWindow(game_state)
             main_win.show()
         else: # If loading fails, show new character dialog
@@ -0,0 +1,148 @@
+"""Headless population simulator for balance tuning.
+
+Creates many characters with create_new_character, fast-forwards each one
+through the game loop with game.simulate in a process pool, and writes an
+aggregate summary (level curves, gold, act progression, inventory size) to a
+JSON file. Only the non-GUI game module is imported, so workers never load
+PySide6.
+
+Example:
+    python population.py --count 2000 --hours 48 --class "Robot Monk" --output pop.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import game
+
+RACE_NAMES = [name for name, _ in game.RACES]
+CLASS_NAMES = [name for name, _ in game.KLASSES]
+
+
+def run_character(job):
+    """Create and simulate one character; returns its summary (runs in a worker)."""
+    seed, race, klass, horizon_sec, sample_sec = job
+    rng = game.AleaRandom()
+    rng.seed([seed])
+    race = race or rng.pick(RACE_NAMES)
+    klass = klass or rng.pick(CLASS_NAMES)
+    name = game.generate_name(rng)
+    stats = game.roll_stats(rng)
+    game_state = game.create_new_character(name, race, klass, stats, rng)
+
+    level_curve = []
+    done = 0
+    while done < horizon_sec:
+        step = min(sample_sec, horizon_sec - done)
+        game.simulate(game_state, step)
+        done += step
+        level_curve.append(game.get_trait_i(game_state, 'Level'))
+
+    inventory = game_state.Inventory
+    return {
+        "seed": seed,
+        "name": name,
+        "race": race,
+        "class": klass,
+        "level": game.get_trait_i(game_state, 'Level'),
+        "level_curve": level_curve,
+        "gold": game.get_inventory_item_qty(game_state, 'Gold'),
+        "act": game_state.act,
+        "tasks": game_state.tasks,
+        "inventory_size": len(inventory) - 1, # Distinct items, Gold excluded
+        "spells": len(game_state.Spells),
+    }
+
+
+def _describe(values):
+    """min/mean/median/max of a list of numbers."""
+    if not values: return {}
+    return {"min": min(values), "mean": statistics.fmean(values),
+            "median": statistics.median(values), "max": max(values)}
+
+
+def aggregate(results, sample_sec):
+    """Combine per-character summaries into the population summary."""
+    curve_len = max((len(r["level_curve"]) for r in results), default=0)
+    level_curve = []
+    for i in range(curve_len):
+        levels = [r["level_curve"][i] for r in results if i < len(r["level_curve"])]
+        level_curve.append({"hours": (i + 1) * sample_sec / 3600, **_describe(levels)})
+
+    by_class = defaultdict(list)
+    by_race = defaultdict(list)
+    for r in results:
+        by_class[r["class"]].append(r["level"])
+        by_race[r["race"]].append(r["level"])
+
+    return {
+        "characters": len(results),
+        "level": _describe([r["level"] for r in results]),
+        "level_curve": level_curve,
+        "gold": _describe([r["gold"] for r in results]),
+        "tasks": _describe([r["tasks"] for r in results]),
+        "inventory_size": _describe([r["inventory_size"] for r in results]),
+        "spells": _describe([r["spells"] for r in results]),
+        "acts": {str(act): n for act, n in sorted(Counter(r["act"] for r in results).items())},
+        "level_by_class": {k: statistics.fmean(v) for k, v in sorted(by_class.items())},
+        "level_by_race": {k: statistics.fmean(v) for k, v in sorted(by_race.items())},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a population of Progress Quest characters.")
+    parser.add_argument("--count", type=int, default=100, help="number of characters (default 100)")
+    parser.add_argument("--seed", type=int, default=1, help="base seed; character i uses seed+i (default 1)")
+    parser.add_argument("--seeds", type=int, nargs="+", help="explicit seeds (overrides --count/--seed)")
+    parser.add_argument("--race", action="append", choices=RACE_NAMES, metavar="RACE",
+                        help="race to use, repeatable; cycled over the population (default: random)")
+    parser.add_argument("--class", dest="klass", action="append", choices=CLASS_NAMES, metavar="CLASS",
+                        help="class to use, repeatable; cycled over the population (default: random)")
+    parser.add_argument("--hours", type=float, default=24.0, help="game time per character in hours (default 24)")
+    parser.add_argument("--sample-minutes", type=float, default=60.0,
+                        help="level curve sampling interval in game minutes (default 60)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    parser.add_argument("--output", default="population_summary.json", help="summary file (default population_summary.json)")
+    parser.add_argument("--per-character", action="store_true", help="include every character's summary in the output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = args.seeds or [args.seed + i for i in range(args.count)]
+    horizon_sec = round(args.hours * 3600)
+    sample_sec = max(1, round(args.sample_minutes * 60))
+    races = args.race or [None]
+    klasses = args.klass or [None]
+    jobs = [(seed, races[i % len(races)], klasses[i % len(klasses)], horizon_sec, sample_sec)
+            for i, seed in enumerate(seeds)]
+
+    started = time.perf_counter()
+    chunksize = max(1, len(jobs) // (4 * max(1, args.workers)))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_character, jobs, chunksize=chunksize))
+    wall = time.perf_counter() - started
+
+    summary = aggregate(results, sample_sec)
+    summary["horizon_hours"] = args.hours
+    summary["wall_seconds"] = wall
+    if args.per_character:
+        summary["per_character"] = results
+
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"Simulated {len(results)} characters x {args.hours:g} h in {wall:.1f}s -> {args.output}")
+    if results:
+        level = summary["level"]
+        print(f"Level: mean {level['mean']:.1f}, median {level['median']}, max {level['max']}; acts {summary['acts']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())